@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Measures how long Forseti takes to start and which big libraries it imports
+before running a command.
+
+Usage:
+    python benchmarks/cli_startup.py [--runs=<runs>] [<args>...]
+
+By default, `forseti --version` and `forseti --help` are measured.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Libraries which must only be imported by the commands needing them
+HEAVY_MODULES = [
+    'blessings',
+    'boto',
+    'concurrent',
+    'jinja2',
+    'paramiko',
+    'progressbar',
+]
+
+# Runs the CLI with the given arguments and prints the heavy modules imported
+CLI_SCRIPT = """
+import json
+import sys
+
+heavy_modules = json.loads(sys.argv[2])
+sys.argv = ['forseti'] + json.loads(sys.argv[1])
+from forseti.cli import main
+try:
+    main()
+except SystemExit:
+    pass
+sys.stderr.write(json.dumps(sorted(
+    module for module in heavy_modules if module in sys.modules
+)) + "\\n")
+"""
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_cli(arguments):
+    """
+    Runs the CLI in a new interpreter and returns the seconds it took and the
+    heavy modules it imported
+    """
+    start = time.time()
+    process = subprocess.Popen(
+        [sys.executable, '-c', CLI_SCRIPT, json.dumps(arguments), json.dumps(HEAVY_MODULES)],
+        cwd=ROOT_DIRECTORY,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    _, stderr = process.communicate()
+    seconds_elapsed = time.time() - start
+    if process.returncode != 0:
+        raise RuntimeError(stderr)
+
+    return seconds_elapsed, json.loads(stderr.strip().splitlines()[-1])
+
+
+def benchmark(arguments, runs):
+    timings = []
+    imported = []
+    for _ in range(runs):
+        seconds_elapsed, imported = run_cli(arguments)
+        timings.append(seconds_elapsed * 1000)
+    timings.sort()
+
+    print "forseti %s" % ' '.join(arguments)
+    print "    min %.1fms, median %.1fms, max %.1fms in %d runs" % (
+        timings[0],
+        timings[len(timings) // 2],
+        timings[-1],
+        runs
+    )
+    print "    heavy modules imported: %s" % (', '.join(imported) or 'none')
+
+    return imported
+
+
+def main():
+    runs = 10
+    arguments = []
+    for argument in sys.argv[1:]:
+        if argument.startswith('--runs='):
+            runs = int(argument.split('=', 1)[1])
+        else:
+            arguments.append(argument)
+
+    commands = [arguments] if arguments else [['--version'], ['--help']]
+    imported = [benchmark(command, runs) for command in commands]
+    if not arguments and any(imported):
+        sys.exit("Heavy modules were imported before running any command")
+
+
+if __name__ == '__main__':
+    main()
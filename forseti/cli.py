@@ -2,26 +2,20 @@
 """Forseti is a tool to manage AWS autoscaling groups.
 
 Usage:
-    {% for doc in command_docs -%}
-    forseti {{ doc }}
-    {% endfor -%}
+%(command_docs)s
     forseti (-h | --help)
     forseti --version
 
 Options:
-    {% for doc in command_options -%}
-    {{ doc }}
-    {% endfor -%}
+%(command_options)s
     -h --help             Show this screen.
     --version             Show version.
 """
 
-import sys
 from docopt import docopt
 from forseti import __version__ as forseti_version
 from forseti.configuration import ForsetiConfiguration
 from forseti.commands.base import get_all_commands
-from jinja2 import Template
 import os.path
 
 
@@ -41,50 +35,58 @@ def read_configuration_file():
         raise exception
 
 
-def generate_dosctring():
+def get_commands():
+    """
+    Get the instances of all the commands. Building them is cheap because
+    commands only import deployers, models and readers when they run.
+    """
+    return [command_class() for command_class in get_all_commands()]
+
+
+def generate_dosctring(commands=None):
     commands_documentation = []
     options_documentation = []
 
-    commands = get_all_commands()
-    for command_class in commands:
-        command = command_class()
+    for command in commands or get_commands():
         command_doc = command.cli_command_doc()
         if command_doc:
-            commands_documentation.append(command_doc)
+            commands_documentation.append("    forseti %s" % command_doc)
         comand_options_docs = command.cli_command_options_doc()
         if comand_options_docs:
-            options_documentation.append(comand_options_docs)
+            options_documentation.append("    %s" % comand_options_docs)
 
-    return Template(__doc__).render(
-        command_docs=commands_documentation,
-        command_options=options_documentation,
-        app_name=sys.argv[0]
-    )
+    return __doc__ % {
+        'command_docs': "\n".join(commands_documentation),
+        'command_options': "\n".join(options_documentation),
+    }
 
 
-def commands_arguments_mapper():
-    mapper = []
-    commands = get_all_commands()
-    for command_class in commands:
-        command = command_class()
-        mapper.append(
-            (command.cli_command_name(), command)
-        )
-
-    return mapper
+def commands_arguments_mapper(commands=None):
+    return [
+        (command.cli_command_name(), command)
+        for command in commands or get_commands()
+    ]
 
 
 def main():
-    arguments = docopt(generate_dosctring())
+    commands = get_commands()
+    arguments = docopt(generate_dosctring(commands))
     if arguments['--version']:
         print "Forseti %s" % forseti_version
         return
 
     configuration = read_configuration_file()
 
-    for cli_command, forseti_command in commands_arguments_mapper():
+    # Imported here, as it imports all the models
+    from forseti.models.identity import identity_scope
+
+    for cli_command, forseti_command in commands_arguments_mapper(commands):
         if arguments[cli_command]:
-            forseti_command.run(configuration, arguments)
+            forseti_command.setup_executor(configuration)
+            forseti_command.setup_cache_invalidation(configuration)
+            # Every command works with a single object per AWS resource
+            with identity_scope():
+                forseti_command.run(configuration, arguments)
 
 
 if __name__ == '__main__':
@@ -24,6 +24,54 @@ class BaseForsetiCommand(object):
     def cli_command_options_doc(self):
         raise NotImplementedError
 
+    def setup_executor(self, configuration):
+        """
+        Sets the size of the pool running AWS operations in the background,
+        see `forseti.models.executor.ModelExecutor`, if it's defined in the
+        configuration
+        """
+        workers = configuration.get_aws_workers()
+        if workers is None:
+            return
+
+        from forseti.models.executor import executor
+
+        executor.resize(workers)
+
+    def setup_cache_invalidation(self, configuration):
+        """
+        Installs the cache of AWS describe responses if it's defined in the
+        configuration, so any change done by the command clears it. Cached
+        responses are only read by commands calling `setup_cache`.
+        """
+        cache_configuration = configuration.get_cache_configuration()
+        if not cache_configuration:
+            return
+
+        from forseti.models.cache import DescribeCache
+        from forseti.models.connections import registry
+
+        registry.cache = DescribeCache(
+            cache_configuration.get('directory', '~/.forseti/cache'),
+            ttls=cache_configuration.get('ttl'),
+            max_size=cache_configuration.get('max_size'),
+            read_responses=False
+        )
+
+    def setup_cache(self, configuration, cli_arguments):
+        """
+        Makes the command read the cached AWS describe responses if the cache
+        is defined in the configuration, unless `--no-cache` is given
+        """
+        from forseti.models.connections import registry
+
+        if registry.cache is None:
+            self.setup_cache_invalidation(configuration)
+        if registry.cache is None or cli_arguments.get('--no-cache'):
+            return
+
+        registry.cache.read_responses = True
+
 
 def get_all_commands():
     module = importlib.import_module("forseti.commands.commands")
@@ -1,13 +1,14 @@
-import os
+"""
+Forseti commands.
+
+Deployers, models and readers import boto, paramiko and other big libraries,
+so they're imported by the commands which use them when they run. This way,
+building the usage text or running a command only imports what it needs.
+"""
+from docopt import DocoptExit
 
 from .base import BaseForsetiCommand
-from forseti.deployers import (
-    DeployAndSnapshotDeployer,
-    GoldenInstanceDeployer,
-)
 from forseti.exceptions import ForsetiDeployException, ForsetiConfigurationException
-from forseti.models import EC2AutoScaleGroup
-from forseti.readers import DefaultReader
 
 
 class BaseDeployCommand(BaseForsetiCommand):
@@ -32,6 +33,11 @@ class BaseDeployCommand(BaseForsetiCommand):
     def _get_deployer_from_strategy(
         self, strategy, application, configuration, extra_args=None
     ):
+        from forseti.deployers import (
+            DeployAndSnapshotDeployer,
+            GoldenInstanceDeployer,
+        )
+
         if strategy == 'deploy_and_snapshot':
             return DeployAndSnapshotDeployer(
                 application,
@@ -56,20 +62,60 @@ class DeployCommand(BaseDeployCommand):
         return "deploy"
 
     def cli_command_doc(self):
-        return ("%s <app> [--ami=<ami-id>] "
+        return ("%s (<apps>... | --all) [--ami=<ami-id>] [--concurrency=<n>] "
                 "[-- <args>...]" % self.cli_command_name())
 
     def cli_command_options_doc(self):
-        return ("--ami=<ami-id>        AMI id to be used "
-                "instead of creating a golden one.")
+        return """--ami=<ami-id>        AMI id to be used instead of creating a golden one.
+                          Only allowed when deploying a single application.
+    --all                 Deploy all the applications.
+    --concurrency=<n>     Number of applications deployed at the same time [default: 4]"""
 
     def run(self, configuration, cli_arguments):
-        deployer = self._get_deployer(
-            cli_arguments['<app>'],
-            configuration,
-            cli_arguments['<args>']
+        from forseti.deployers import ParallelDeployment
+
+        try:
+            concurrency = int(cli_arguments['--concurrency'])
+        except ValueError:
+            concurrency = 0
+        if concurrency < 1:
+            raise DocoptExit('--concurrency must be a positive integer')
+
+        if cli_arguments['--all']:
+            applications = configuration.application_names
+        else:
+            applications = cli_arguments['<apps>']
+
+        # An AMI belongs to a single application
+        if cli_arguments['--ami'] and (cli_arguments['--all'] or len(applications) > 1):
+            raise ForsetiDeployException(
+                '--ami can only be used when deploying a single application'
+            )
+
+        deployers = [
+            self._get_deployer(
+                application,
+                configuration,
+                cli_arguments['<args>']
+            )
+            for application in applications
+        ]
+        if len(deployers) == 1:
+            deployers[0].deploy(cli_arguments['--ami'])
+            return
+
+        deployment = ParallelDeployment(
+            deployers,
+            max_workers=concurrency
         )
-        deployer.deploy(cli_arguments['--ami'])
+        results = deployment.deploy(cli_arguments['--ami'])
+        deployment.print_summary()
+        if not all(result.succeeded for result in results):
+            raise ForsetiDeployException(
+                'Deployment failed for %s' % ', '.join(
+                    [result.application for result in results if not result.succeeded]
+                )
+            )
 
 
 class InitCommand(BaseDeployCommand):
@@ -114,11 +160,15 @@ class CleanUpAutoscaleConfigurationsCommand(BaseDeployCommand):
                           want to leave when doing a cleanup [default: 4]"""
 
     def run(self, configuration, cli_arguments):
+        from forseti.deployers import LaunchConfigurationsCleaner
+
+        # Deletions can't be undone, so they're decided from fresh responses
         if cli_arguments['<app>']:
             applications = [cli_arguments['<app>']]
         else:
             applications = configuration.applications.keys()
 
+        configurations = []
         for application in applications:
             print "\nApplication: %s" % application
             print "============="
@@ -126,10 +176,17 @@ class CleanUpAutoscaleConfigurationsCommand(BaseDeployCommand):
                 application,
                 configuration,
             )
-            deployer.cleanup_autoscale_configurations(
-                int(cli_arguments['--desired_configurations'])
+            configurations.extend(
+                deployer.get_autoscale_configurations_to_cleanup(
+                    int(cli_arguments['--desired_configurations'])
+                )
             )
 
+        cleaner = LaunchConfigurationsCleaner()
+        cleaner.cleanup(configurations)
+        cleaner.print_summary()
+        cleaner.raise_for_errors()
+
 
 class RegenerateAutoscalegroupCommand(BaseDeployCommand):
     def cli_command_name(self):
@@ -155,18 +212,23 @@ class StatusCommand(BaseForsetiCommand):
 
     def cli_command_doc(self):
         return ("%s <app> [--daemon] [--activities=<amount>] "
-                "[--format=<format>]" % self.cli_command_name())
+                "[--format=<format>] [--no-cache]" % self.cli_command_name())
 
     def cli_command_options_doc(self):
         return """--activities=<amount> Number of latest activities to show
     --format=<format>     How to format the status."""
 
     def run(self, configuration, cli_arguments):
+        from forseti.readers import DefaultReader
+
         application = cli_arguments['<app>']
         format = cli_arguments['--format']
         reader = DefaultReader(configuration, format=format)
         daemon = cli_arguments['--daemon']
         activities = cli_arguments['--activities']
+        # The daemon refreshes the status, so it must not be cached
+        if not daemon:
+            self.setup_cache(configuration, cli_arguments)
         reader.status(application, daemon=daemon, activities=activities)
 
 
@@ -175,19 +237,19 @@ class ListAutoscaleConfigurationsCommand(BaseForsetiCommand):
         return "list_configurations"
 
     def cli_command_doc(self):
-        return "%s [<app>]" % self.cli_command_name()
+        return "%s [<app>] [--no-cache]" % self.cli_command_name()
 
     def cli_command_options_doc(self):
-        return None
+        return """--no-cache            Request AWS again instead of using cached responses."""
 
     def run(self, configuration, cli_arguments):
+        from forseti.readers import DefaultReader
+
+        self.setup_cache(configuration, cli_arguments)
         if cli_arguments['<app>']:
             applications = [cli_arguments['<app>']]
         else:
             applications = configuration.applications.keys()
 
         reader = DefaultReader(configuration)
-        for application in applications:
-            print "\nApplication: %s" % application
-            print "============="
-            reader.list_autoscale_configurations(application)
+        reader.list_applications_autoscale_configurations(applications)
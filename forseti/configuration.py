@@ -17,6 +17,8 @@ class ForsetiConfiguration(object):
     GROUPS_KEY = 'groups'
     POLICIES_KEY = 'policies'
     ALARMS_KEY = 'alarms'
+    CACHE_KEY = 'cache'
+    AWS_WORKERS_KEY = 'aws_workers'
 
     # Application configuration keys
     GOLD_KEY = 'gold'
@@ -140,6 +142,28 @@ class ForsetiConfiguration(object):
 
         return value
 
+    def get_cache_configuration(self):
+        """
+        Get the configuration of the cache of AWS responses, or `None` if
+        it's not defined, so the cache is disabled.
+        """
+        return self.forseti_configuration.get(self.CACHE_KEY)
+
+    def get_aws_workers(self):
+        """
+        Get the maximum amount of AWS operations run at once in the
+        background, or `None` to use the default.
+        """
+        workers = self.forseti_configuration.get(self.AWS_WORKERS_KEY)
+        if workers is None:
+            return None
+        if not isinstance(workers, int) or workers < 1:
+            raise ForsetiConfigurationException(
+                "%s must be a positive integer" % self.AWS_WORKERS_KEY
+            )
+
+        return workers
+
     def get_application_configuration(self, application):
         """
         Get the `application` configuration dictionary.
@@ -1,2 +1,4 @@
 from forseti.deployers.deploy_and_snapshot import DeployAndSnapshotDeployer
 from forseti.deployers.golden_instance import GoldenInstanceDeployer
+from forseti.deployers.parallel import ParallelDeployment
+from forseti.deployers.cleanup import LaunchConfigurationsCleaner
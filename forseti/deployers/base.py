@@ -1,5 +1,5 @@
 import abc
-import natsort
+import functools
 
 from forseti.models import (
     EC2AutoScaleGroup,
@@ -9,8 +9,16 @@ from forseti.models import (
     CloudWatchMetricAlarm,
     SNSMessageSender
 )
+from forseti.models.events import (
+    AutoScaleEventListener,
+    SQSEventQueue,
+)
+from forseti.deployers.cleanup import LaunchConfigurationsCleaner
 from forseti.exceptions import ForsetiException
-from forseti.utils import balloon_timer
+from forseti.utils import (
+    TaskGraph,
+    balloon_timer,
+)
 
 
 class BaseDeployer(object):
@@ -47,7 +55,7 @@ class BaseDeployer(object):
         return config
 
     def _get_autoscaling_group(self):
-        return EC2AutoScaleGroup(
+        return EC2AutoScaleGroup.get(
             self.autoscale_group_name,
             self.application,
         )
@@ -59,7 +67,7 @@ class BaseDeployer(object):
         :param autoscale_config: Auto scale launch configuration to be assigned
                                  to the auto scale group.
         """
-        group = EC2AutoScaleGroup(
+        group = EC2AutoScaleGroup.get(
             self.autoscale_group_name,
             self.application,
             self.configuration.get_autoscale_group_configuration(self.application)
@@ -69,6 +77,24 @@ class BaseDeployer(object):
 
         return group
 
+    def update_or_create_autoscale_policy(self, policy_name, group):
+        """
+        Creates or updates an autoscale policy `EC2AutoScalePolicy`
+
+        :param policy_name: Name of the policy in the configuration.
+        :param group: Auto scale group to create the policy in.
+        """
+        policy = EC2AutoScalePolicy(
+            policy_name,
+            group,
+            self.application,
+            self.configuration.get_policy_configuration(policy_name)
+        )
+        policy.update_or_create()
+        self.policies[policy_name] = policy
+
+        return policy
+
     def update_or_create_autoscale_policies(self, group):
         """
         Creates or updates autoscale policies `EC2AutoScalePolicy`
@@ -77,14 +103,25 @@ class BaseDeployer(object):
         """
         policies = self.configuration.get_scaling_policies(self.application)
         for policy_name in policies:
-            policy = EC2AutoScalePolicy(
-                policy_name,
-                group,
-                self.application,
-                self.configuration.get_policy_configuration(policy_name)
-            )
-            policy.update_or_create()
-            self.policies[policy_name] = policy
+            self.update_or_create_autoscale_policy(policy_name, group)
+
+    def update_or_create_metric_alarm(self, alarm_name, policy):
+        """
+        Creates or updates a CloudWatch alarm `CloudWatchMetricAlarm`
+
+        :param alarm_name: Name of the alarm in the configuration.
+        :param policy: Autoscale policy triggered by the alarm.
+        """
+        alarm = CloudWatchMetricAlarm(
+            alarm_name,
+            policy,
+            self.application,
+            self.configuration.alarms[alarm_name]
+        )
+        alarm.update_or_create()
+        self.alarms[alarm_name] = alarm
+
+        return alarm
 
     def update_or_create_metric_alarms(self, group):
         """
@@ -94,15 +131,7 @@ class BaseDeployer(object):
         for alarm_name, alarm_properties in alarms.items():
             alarm_actions = alarm_properties['alarm_actions']
             if alarm_actions in self.policies:
-                policy = self.policies[alarm_actions]
-                alarm = CloudWatchMetricAlarm(
-                    alarm_name,
-                    policy,
-                    self.application,
-                    alarm_properties
-                )
-                alarm.update_or_create()
-                self.alarms[alarm_name] = alarm
+                self.update_or_create_metric_alarm(alarm_name, self.policies[alarm_actions])
 
     def update_or_create_autoscale_notifications(self):
         """
@@ -124,6 +153,21 @@ class BaseDeployer(object):
 
             autoscale_notification.update_or_create()
 
+    def get_autoscale_event_listener(self):
+        """
+        Get an `AutoScaleEventListener` consuming the autoscale notifications
+        from the SQS queue defined in `autoscale_events_queue`, or `None` if
+        the application doesn't define it.
+        """
+        queue_name = self.application_configuration.get('autoscale_events_queue')
+        if not queue_name:
+            return None
+
+        return AutoScaleEventListener(
+            SQSEventQueue(queue_name),
+            self.application_configuration['autoscale_group']
+        )
+
     def setup_autoscale(self, ami_id):
         """
         Creates or updates the autoscale group, launch configuration, autoscaling
@@ -137,27 +181,104 @@ class BaseDeployer(object):
         )
         self.autoscale_group_name = self.application_configuration['autoscale_group']
 
-        print "Creating autoscale config %s" % (self.autoscale_group_name)
-        autoscale_config = self.create_autoscale_configuration(ami_id)
-        print "Created autoscale config %s" % (self.autoscale_group_name)
+        graph = self.get_autoscale_setup_graph(ami_id)
+        results = graph.run()
+        print "Autoscale setup timings:"
+        graph.print_timings()
 
-        print "Creating autoscale group %s" % (self.autoscale_group_name)
-        group = self.update_or_create_autoscale_group(autoscale_config)
-        print "Created autoscale group %s" % (self.autoscale_group_name)
+        group = results['group']
+        self.configure_autoscale_group(group)
 
-        print "Creating autoscale notifications"
-        self.update_or_create_autoscale_notifications()
-        print "Created autoscale notifications"
+        return group
 
-        print "Creating autoscale policies"
-        self.update_or_create_autoscale_policies(group)
-        print "Created autoscale policies"
+    def configure_autoscale_group(self, group):
+        """
+        Applies the settings of the application which tell the group how to
+        wait for its instances, whatever the deployment strategy is
+        """
+        group.event_listener = self.get_autoscale_event_listener()
+        group.health_stability.update(
+            self.application_configuration.get('health_check_stability', {})
+        )
+        group.rolling_deployment = self.application_configuration.get('rolling_deployment')
 
-        print "Creating metric alarms which will trigger autoscaling"
-        self.update_or_create_metric_alarms(group)
-        print "Created metric alarms"
+    def _logged(self, function, start_message, end_message):
+        """
+        Wraps `function` so it prints `start_message` before running and
+        `end_message` after it
+        """
+        def wrapper(*args):
+            print start_message
+            result = function(*args)
+            print end_message
+            return result
 
-        return group
+        return wrapper
+
+    def get_autoscale_setup_graph(self, ami_id):
+        """
+        Get the `TaskGraph` which creates or updates the launch configuration,
+        the autoscale group, its notifications, the autoscaling policies and
+        the CloudWatch alarms. Notifications and policies are set up once the
+        group exists, and every alarm as soon as its policy exists.
+
+        :param ami_id: AMI id used for the new autoscale system
+        """
+        graph = TaskGraph()
+        graph.add(
+            'config',
+            self._logged(
+                lambda: self.create_autoscale_configuration(ami_id),
+                "Creating autoscale config %s" % self.autoscale_group_name,
+                "Created autoscale config %s" % self.autoscale_group_name
+            )
+        )
+        graph.add(
+            'group',
+            self._logged(
+                self.update_or_create_autoscale_group,
+                "Creating autoscale group %s" % self.autoscale_group_name,
+                "Created autoscale group %s" % self.autoscale_group_name
+            ),
+            depends_on=['config']
+        )
+        graph.add(
+            'notifications',
+            self._logged(
+                lambda group: self.update_or_create_autoscale_notifications(),
+                "Creating autoscale notifications",
+                "Created autoscale notifications"
+            ),
+            depends_on=['group']
+        )
+
+        policies = self.configuration.get_scaling_policies(self.application)
+        for policy_name in policies:
+            graph.add(
+                'policy:%s' % policy_name,
+                self._logged(
+                    functools.partial(self.update_or_create_autoscale_policy, policy_name),
+                    "Creating autoscale policy %s" % policy_name,
+                    "Created autoscale policy %s" % policy_name
+                ),
+                depends_on=['group']
+            )
+
+        for alarm_name, alarm_properties in self.configuration.alarms.items():
+            policy_name = alarm_properties['alarm_actions']
+            if policy_name not in policies:
+                continue
+            graph.add(
+                'alarm:%s' % alarm_name,
+                self._logged(
+                    functools.partial(self.update_or_create_metric_alarm, alarm_name),
+                    "Creating metric alarm %s" % alarm_name,
+                    "Created metric alarm %s" % alarm_name
+                ),
+                depends_on=['policy:%s' % policy_name]
+            )
+
+        return graph
 
     def deploy(self, ami_id):
         """
@@ -169,6 +290,25 @@ class BaseDeployer(object):
         minutes, seconds = divmod(int(balloon.seconds_elapsed), 60)
         print "Total deployment time: %02d:%02d" % (minutes, seconds)
 
+    def get_autoscale_configurations_to_cleanup(self, desired_configurations=4):
+        """
+        Get the launch configurations of the autoscaling group belonging to
+        the application which should be deleted to leave only the
+        `desired_configurations` newest ones. A message is sent for them.
+        """
+        self.autoscale_group_name = self.application_configuration['autoscale_group']
+        group = self._get_autoscaling_group()
+        configurations = group.get_all_launch_configurations()
+
+        # Get the first configurations minus the `desired_configurations`
+        configurations_to_be_deleted = configurations[:max(len(configurations) - desired_configurations, 0)]
+        if configurations_to_be_deleted:
+            names = ", ".join([configuration.name for configuration in configurations_to_be_deleted])
+            self.send_sns_message("Deleting launch configurations %s" % names)
+            print "Deleting launch configurations %s" % names
+
+        return configurations_to_be_deleted
+
     def cleanup_autoscale_configurations(self, desired_configurations=4):
         """
         Clean up all launch configurations of the autoscaling group belonging
@@ -177,20 +317,10 @@ class BaseDeployer(object):
         When a launch configuration is deleted, the AMI and snapshot will be
         deleted too.
         """
-        with balloon_timer(""):
-            self.autoscale_group_name = self.application_configuration['autoscale_group']
-            group = self._get_autoscaling_group()
-            configurations = group.get_all_launch_configurations()
-
-            # Get the first configurations minus the `desired_configurations`
-            configurations_to_be_deleted = configurations[:-desired_configurations]
-            configurations_to_be_deleted = natsort.natsorted(configurations_to_be_deleted)
-            for configuration in configurations_to_be_deleted:
-                self.send_sns_message(
-                    "Deleting launch configuration %s" % configuration.name
-                )
-                print "Deleting launch configuration %s" % configuration.name
-                configuration.delete()
+        cleaner = LaunchConfigurationsCleaner()
+        cleaner.cleanup(self.get_autoscale_configurations_to_cleanup(desired_configurations))
+        cleaner.print_summary()
+        cleaner.raise_for_errors()
 
     def send_sns_message(self, message, subject=None, extra_attributes=None):
         """
@@ -0,0 +1,154 @@
+import threading
+import time
+
+from boto.exception import BotoServerError
+from concurrent.futures import ThreadPoolExecutor
+
+from forseti.exceptions import ForsetiException
+from forseti.models import EC2AMI
+from forseti.models.base import EC2AutoScale
+from forseti.utils import (
+    RateLimiter,
+    balloon_timer,
+)
+
+
+class LaunchConfigurationsCleaner(object):
+    """
+    Deletes launch configurations together with their AMIs and snapshots.
+
+    All the AMIs and snapshots are described at once, and the deletions run
+    in a pool of `max_workers` threads sharing a `RateLimiter` of `rate` AWS
+    calls per second. AMIs used by any launch configuration which is not
+    deleted, whether it belongs to a group or not, are kept.
+    """
+
+    def __init__(self, max_workers=8, rate=5):
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.launch_configurations = []
+        self.amis = []
+        self.snapshots = []
+        self.freed_size = 0
+        self.errors = []
+        self.seconds_elapsed = 0
+        self._lock = threading.Lock()
+
+    def _record(self, attribute, value, size=0):
+        with self._lock:
+            getattr(self, attribute).append(value)
+            self.freed_size += size
+
+    def _error(self, message):
+        with self._lock:
+            self.errors.append(message)
+        print message
+
+    def _delete_image_configurations(self, configurations, ami):
+        """
+        Deletes launch `configurations` sharing an image and then the image
+        `ami` and its snapshot, if given. The image is kept if any of the
+        configurations could not be deleted.
+        """
+        for configuration in configurations:
+            self.limiter.acquire()
+            try:
+                configuration.autoscale.delete_launch_configuration(configuration.name)
+            except BotoServerError as exception:
+                self._error(
+                    "The launch configuration %s could not be deleted: %s" %
+                    (configuration.name, exception.message)
+                )
+                return
+            print "Deleted launch configuration %s" % configuration.name
+            self._record('launch_configurations', configuration.name)
+
+        if ami is None or ami.resource is None:
+            return
+
+        self.limiter.acquire()
+        try:
+            ami.ec2.deregister_image(ami.ami_id)
+        except BotoServerError as exception:
+            self._error("The AMI %s could not be deleted: %s" % (ami.ami_id, exception.message))
+            return
+        print "Deleted AMI %s" % ami.ami_id
+        self._record('amis', ami.ami_id)
+
+        if ami.snapshot is None:
+            return
+
+        self.limiter.acquire()
+        try:
+            ami.ec2.delete_snapshot(ami.snapshot.id)
+        except BotoServerError as exception:
+            self._error(
+                "The snapshot %s could not be deleted: %s" %
+                (ami.snapshot.id, exception.message)
+            )
+            return
+        print "Deleted snapshot %s" % ami.snapshot.id
+        self._record('snapshots', ami.snapshot.id, ami.snapshot.volume_size or 0)
+
+    def cleanup(self, configurations):
+        """
+        Deletes the launch `configurations`, a list of `EC2AutoScaleConfig`,
+        and their AMIs and snapshots
+        """
+        start = time.time()
+        names = set(configuration.name for configuration in configurations)
+        images_in_use = set(
+            resource.image_id
+            for resource in EC2AutoScale.get_launch_configurations()
+            if resource.name not in names
+        )
+
+        configurations_by_image = {}
+        for configuration in configurations:
+            configurations_by_image.setdefault(configuration.resource.image_id, []).append(configuration)
+        amis = EC2AMI.load_many(None, configurations_by_image.keys())
+
+        with balloon_timer("Deleting %d launch configurations" % len(configurations)):
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._delete_image_configurations,
+                        image_configurations,
+                        amis[image_id] if image_id not in images_in_use else None
+                    )
+                    for image_id, image_configurations in configurations_by_image.items()
+                ]
+
+        EC2AutoScale.invalidate_launch_configurations_index()
+        self.seconds_elapsed = time.time() - start
+
+        # Raise any unexpected error
+        for future in futures:
+            future.result()
+
+    def print_summary(self):
+        """
+        Prints what has been deleted and how long it took
+        """
+        minutes, seconds = divmod(int(self.seconds_elapsed), 60)
+        print "\nDeleted %d launch configurations, %d AMIs and %d snapshots (%d GiB) in %02d:%02d" % (
+            len(self.launch_configurations),
+            len(self.amis),
+            len(self.snapshots),
+            self.freed_size,
+            minutes,
+            seconds
+        )
+        if self.errors:
+            print "%d errors found:" % len(self.errors)
+            for error in self.errors:
+                print "- %s" % error
+
+    def raise_for_errors(self):
+        """
+        Raises a `ForsetiException` if anything could not be deleted
+        """
+        if self.errors:
+            raise ForsetiException(
+                "%d errors found cleaning up launch configurations" % len(self.errors)
+            )
@@ -10,7 +10,15 @@ from forseti.models import (
     EC2Instance,
 )
 from forseti.deployers.base import BaseDeployer
-from forseti.utils import balloon_timer
+from forseti.deployers.sharding import ShardedCommand
+from forseti.ssh import (
+    ParallelSSHExecutor,
+    SSHConnectionPool,
+)
+from forseti.utils import (
+    balloon_timer,
+    run_command,
+)
 
 
 class DeployAndSnapshotDeployer(BaseDeployer):
@@ -23,7 +31,7 @@ class DeployAndSnapshotDeployer(BaseDeployer):
         self.group = None
 
     def _get_group(self):
-        group = EC2AutoScaleGroup(
+        group = EC2AutoScaleGroup.get(
             self.configuration.get_autoscale_group(self.application),
             self.application,
             self.configuration.get_autoscale_group_configuration(self.application)
@@ -36,21 +44,18 @@ class DeployAndSnapshotDeployer(BaseDeployer):
         if not running_instances:
             return None
 
-        instances = []
-        for instance_id in running_instances:
-            instance = EC2Instance(
-                self.application,
-                configuration=None,
-                instance_id=instance_id
-            )
-            instances.append(instance)
-
-        return instances
+        return EC2Instance.load_many(self.application, running_instances)
 
     def deploy_instances_in_group(self, group):
         """
         Deploy conde into the instances of the autoscale group. This is done
         by executing `command` from `deploy` configuration in `working_directory`.
+
+        If the `deploy` configuration has a `shards` setting, the instances
+        are split in that amount of shards and the command is run for each
+        one at the same time, see `deploy_instances_in_shards`. If it has
+        `remote_commands`, they are run in the instances over SSH instead, see
+        `deploy_instances_over_ssh`.
         """
         instances = self._get_instances(group)
         if not instances:
@@ -58,22 +63,80 @@ class DeployAndSnapshotDeployer(BaseDeployer):
                 'This deployer needs to have some instances running in the group'
             )
 
+        deploy_configuration = self.configuration.get_application_configuration(self.application)['deploy']
+        if 'remote_commands' in deploy_configuration:
+            return self.deploy_instances_over_ssh(instances, deploy_configuration)
+        if 'shards' in deploy_configuration:
+            return self.deploy_instances_in_shards(instances, deploy_configuration)
+
         with balloon_timer("Deploying new code on instances") as balloon:
-            deploy_configuration = self.configuration.get_application_configuration(self.application)['deploy']
             command = deploy_configuration['command'].format(
                 dns_name=','.join([instance.instance.public_dns_name for instance in instances])
             )
             if self.command_args:
                 command = '%s %s' % (command, self.command_args)
 
-            former_directory = os.getcwd()
-            os.chdir(deploy_configuration['working_directory'])
-            retvalue = os.system(command)
+            retvalue = run_command(command, deploy_configuration['working_directory'])
             if retvalue != 0:
                 raise ForsetiDeployException(
                     'Deployment command did not return 0 as expected, returned: %s' % retvalue
                 )
-            os.chdir(former_directory)
+
+        return instances
+
+    def deploy_instances_in_shards(self, instances, deploy_configuration):
+        """
+        Deploy code into `instances` split in `shards` groups, running the
+        deployment command for every shard at the same time. A failing shard
+        is retried `shard_retries` times.
+        """
+        sharded_command = ShardedCommand(
+            deploy_configuration['command'],
+            [instance.instance.public_dns_name for instance in instances],
+            shards=int(deploy_configuration['shards']),
+            working_directory=deploy_configuration['working_directory'],
+            retries=int(deploy_configuration.get('shard_retries', 0)),
+            command_args=self.command_args
+        )
+        with balloon_timer("Deploying new code on instances in %d shards" % sharded_command.shards):
+            sharded_command.run()
+        sharded_command.print_summary()
+
+        failed_results = sharded_command.failed_results
+        if failed_results:
+            raise ForsetiDeployException(
+                'Deployment command failed in shards %s' %
+                ', '.join([str(result.shard + 1) for result in failed_results])
+            )
+
+        return instances
+
+    def deploy_instances_over_ssh(self, instances, deploy_configuration):
+        """
+        Deploy code into `instances` running `remote_commands` in all of them
+        over SSH, up to `ssh_workers` instances at the same time.
+        """
+        pool = SSHConnectionPool(
+            deploy_configuration['username'],
+            deploy_configuration.get('key_filename')
+        )
+        executor = ParallelSSHExecutor(pool, int(deploy_configuration.get('ssh_workers', 10)))
+        try:
+            with balloon_timer("Deploying new code on instances over SSH"):
+                executor.run(
+                    [instance.instance.public_dns_name for instance in instances],
+                    deploy_configuration['remote_commands']
+                )
+        finally:
+            pool.close()
+        executor.print_summary()
+
+        failed_results = executor.failed_results
+        if failed_results:
+            raise ForsetiDeployException(
+                'Deployment commands failed in instances %s' %
+                ', '.join([result.host for result in failed_results])
+            )
 
         return instances
 
@@ -0,0 +1,98 @@
+import sys
+import time
+import traceback
+
+from concurrent.futures import ThreadPoolExecutor
+
+from forseti.models.identity import identity_scope
+from forseti.utils import ThreadPrefixedStream
+
+
+class DeploymentResult(object):
+    """
+    Result of the deployment of an application
+    """
+
+    def __init__(self, application, seconds_elapsed, exception=None):
+        self.application = application
+        self.seconds_elapsed = seconds_elapsed
+        self.exception = exception
+
+    @property
+    def succeeded(self):
+        return self.exception is None
+
+
+class ParallelDeployment(object):
+    """
+    Deploys several applications at the same time using a pool of
+    `max_workers` threads. The output of each deployment is prefixed with
+    its application name, and a failing deployment doesn't stop the rest.
+    """
+
+    def __init__(self, deployers, max_workers=4):
+        """
+        :param deployers: List of `BaseDeployer`, one per application
+        :param max_workers: Maximum amount of applications deployed at once
+        """
+        self.deployers = deployers
+        self.max_workers = max_workers
+        self.results = []
+        self.seconds_elapsed = 0
+
+    def _deploy(self, deployer, ami_id=None):
+        """
+        Deploys an application and returns a `DeploymentResult`
+        """
+        sys.stdout.set_prefix("[%s] " % deployer.application)
+        sys.stderr.set_prefix("[%s] " % deployer.application)
+        start = time.time()
+        try:
+            with identity_scope():
+                deployer.deploy(ami_id)
+        except Exception as exception:
+            traceback.print_exc(file=sys.stdout)
+            return DeploymentResult(deployer.application, time.time() - start, exception)
+
+        return DeploymentResult(deployer.application, time.time() - start)
+
+    def deploy(self, ami_id=None):
+        """
+        Deploys all the applications and returns a list of
+        `DeploymentResult`, in the same order as the deployers.
+        """
+        start = time.time()
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = ThreadPrefixedStream(stdout)
+        sys.stderr = ThreadPrefixedStream(stderr)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self._deploy, deployer, ami_id)
+                    for deployer in self.deployers
+                ]
+            self.results = [future.result() for future in futures]
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+        self.seconds_elapsed = time.time() - start
+
+        return self.results
+
+    def print_summary(self):
+        """
+        Prints the result and time of each deployment
+        """
+        print "\nDeployment summary"
+        print "=================="
+        for result in self.results:
+            minutes, seconds = divmod(int(result.seconds_elapsed), 60)
+            print "%s: %s in %02d:%02d%s" % (
+                result.application,
+                "OK" if result.succeeded else "FAILED",
+                minutes,
+                seconds,
+                "" if result.succeeded else " (%s)" % result.exception
+            )
+
+        minutes, seconds = divmod(int(self.seconds_elapsed), 60)
+        print "Total deployment time: %02d:%02d" % (minutes, seconds)
@@ -0,0 +1,125 @@
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from forseti.utils import (
+    run_command,
+    thread_prefixed_stdout,
+)
+
+
+class ShardResult(object):
+    """
+    Result of running a command against a shard of hosts
+    """
+
+    def __init__(self, shard, hosts, exit_code, attempts, seconds_elapsed):
+        self.shard = shard
+        self.hosts = hosts
+        self.exit_code = exit_code
+        self.attempts = attempts
+        self.seconds_elapsed = seconds_elapsed
+
+    @property
+    def succeeded(self):
+        return self.exit_code == 0
+
+
+class ShardedCommand(object):
+    """
+    Runs a shell command against a list of hosts split in `shards` groups,
+    running one command per shard at the same time. The `{dns_name}` token
+    of the command is replaced by the comma separated hosts of each shard,
+    and the output of each one is prefixed with its shard number.
+
+    A failing shard is retried up to `retries` times without affecting the
+    rest of shards.
+    """
+
+    def __init__(self, command, hosts, shards=1, working_directory=None, retries=0, command_args=None):
+        """
+        :param command: Shell command with an optional `{dns_name}` token
+        :param hosts: List of host names
+        :param shards: Amount of groups in which hosts are split
+        :param working_directory: Directory where the commands are run
+        :param retries: Times a failing shard is run again
+        :param command_args: Extra arguments appended to the command
+        """
+        self.command = command
+        self.command_args = command_args
+        self.hosts = hosts
+        self.shards = max(min(shards, len(hosts)), 1)
+        self.working_directory = working_directory
+        self.retries = retries
+        self.results = []
+        self.seconds_elapsed = 0
+
+    def split_hosts(self):
+        """
+        Returns the list of hosts of each shard. Hosts are dealt in turns, so
+        shards differ in one host at most.
+        """
+        return [self.hosts[shard::self.shards] for shard in range(self.shards)]
+
+    def _run_shard(self, shard, hosts, prefix=''):
+        """
+        Runs the command against the `hosts` of a shard and returns a
+        `ShardResult`
+        """
+        sys.stdout.set_prefix("%s[shard %d/%d] " % (prefix, shard + 1, self.shards))
+        command = self.command.format(dns_name=','.join(hosts))
+        if self.command_args:
+            command = '%s %s' % (command, self.command_args)
+        start = time.time()
+        attempts = 0
+        while True:
+            attempts += 1
+            exit_code = run_command(command, self.working_directory)
+            if exit_code == 0 or attempts > self.retries:
+                break
+            print "Command returned %s, retrying (%d/%d)" % (exit_code, attempts, self.retries)
+
+        return ShardResult(shard, hosts, exit_code, attempts, time.time() - start)
+
+    def run(self):
+        """
+        Runs the command in all the shards and returns a list of
+        `ShardResult`, in shard order
+        """
+        start = time.time()
+        # Keep the prefix of the calling thread, for instance when several
+        # applications are deployed at once
+        with thread_prefixed_stdout() as prefix:
+            with ThreadPoolExecutor(max_workers=self.shards) as executor:
+                futures = [
+                    executor.submit(self._run_shard, shard, hosts, prefix)
+                    for shard, hosts in enumerate(self.split_hosts())
+                ]
+            self.results = [future.result() for future in futures]
+        self.seconds_elapsed = time.time() - start
+
+        return self.results
+
+    @property
+    def failed_results(self):
+        return [result for result in self.results if not result.succeeded]
+
+    def print_summary(self):
+        """
+        Prints the exit code, attempts and time of each shard
+        """
+        for result in self.results:
+            minutes, seconds = divmod(int(result.seconds_elapsed), 60)
+            print "Shard %d/%d (%d hosts): %s in %02d:%02d after %d attempts" % (
+                result.shard + 1,
+                self.shards,
+                len(result.hosts),
+                "OK" if result.succeeded else "FAILED with exit code %s" % result.exit_code,
+                minutes,
+                seconds,
+                result.attempts
+            )
+
+        minutes, seconds = divmod(int(self.seconds_elapsed), 60)
+        print "Total command time: %02d:%02d" % (minutes, seconds)
@@ -16,3 +16,11 @@ class ForsetiConfigurationException(ForsetiException):
 
 class ForsetiDeployException(ForsetiException):
     pass
+
+
+class ForsetiTimeoutException(ForsetiException):
+    pass
+
+
+class ForsetiCancelledException(ForsetiException):
+    pass
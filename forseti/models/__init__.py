@@ -1,4 +1,5 @@
 from forseti.models.models import (
+    EC2AMI,
     EC2Instance,
     GoldenEC2Instance,
     EC2AutoScaleConfig,
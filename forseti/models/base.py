@@ -1,9 +1,10 @@
 from datetime import datetime
-from boto.ec2.autoscale import AutoScaleConnection
-from boto.ec2.cloudwatch import CloudWatchConnection
-from boto.ec2.connection import EC2Connection
-from boto.sns.connection import SNSConnection
-from boto.ec2.elb import ELBConnection
+import re
+import threading
+
+from forseti.models.connections import get_connection
+from forseti.models.executor import executor
+from forseti.models.pagination import paginate
 
 
 class AWS(object):
@@ -11,21 +12,33 @@ class AWS(object):
     AWS base class
     """
 
+    # Region used to get connections from the shared registry. `None` means
+    # the region configured in boto. Connections are looked up on each access
+    # so every thread uses its own one.
+    region = None
+
     def __init__(self, application, configuration=None, resource=None):
         self.configuration = configuration or {}
         self.application = application
         self.resource = resource
         self.today = datetime.today().strftime("%Y-%m-%d")
 
+    def submit(self, method, *args, **kwargs):
+        """
+        Runs `method` in the shared `forseti.models.executor.ModelExecutor`
+        and returns a `concurrent.futures.Future` with its result
+        """
+        return executor.submit(method, *args, **kwargs)
+
 
 class EC2(AWS):
     """
     EC2 base class
     """
 
-    def __init__(self, application, configuration=None, resource=None):
-        super(EC2, self).__init__(application, configuration, resource)
-        self.ec2 = EC2Connection()
+    @property
+    def ec2(self):
+        return get_connection('ec2', self.region)
 
 
 class EC2AutoScale(EC2):
@@ -33,38 +46,174 @@ class EC2AutoScale(EC2):
     EC2 autoscale base class
     """
 
+    # Launch configurations created by forseti are named
+    # `<group>-<YYYY-MM-DD>-<version>`
+    LAUNCH_CONFIGURATION_NAME_REGEX = re.compile(
+        r"^(?P<group>.+)-(?P<date>\d{4}-\d{2}-\d{2})-(?P<version>\d+)$"
+    )
+
+    # Launch configurations and their index shared by all the instances, see
+    # `get_launch_configurations_index`
+    _launch_configurations = None
+    _launch_configurations_index = None
+    _launch_configurations_index_lock = threading.Lock()
+
     def __init__(self, name, application, configuration=None, resource=None):
         super(EC2AutoScale, self).__init__(application, configuration, resource)
-        self.autoscale = AutoScaleConnection()
         self.name = name
 
+    @property
+    def autoscale(self):
+        return get_connection('autoscale', self.region)
+
     @property
     def generated_name(self):
         return "%s-%s" % (self.name, self.today)
 
+    @staticmethod
+    def launch_configuration_sort_key(name):
+        """
+        Key to sort launch configuration names by date and version, so
+        `GROUP-2015-05-01-10` goes after `GROUP-2015-05-01-9`
+        """
+        match = EC2AutoScale.LAUNCH_CONFIGURATION_NAME_REGEX.match(name)
+        if not match:
+            return (name, '', 0)
+        return (match.group('group'), match.group('date'), int(match.group('version')))
+
+    @staticmethod
+    def get_launch_configurations_index(refresh=False):
+        """
+        Returns a dictionary whose keys are autoscale group names and values
+        lists of `boto.ec2.autoscale.launchconfig.LaunchConfiguration` sorted
+        by date and version.
+
+        Please, notice that AWS provides no relation between autoscaling
+        configuration and group and it doesn't let you tag launch
+        configurations, so the group is taken from the configuration name.
+        Beware with false positives in case you have similar names.
+
+        The index is built listing all the launch configurations once and
+        it's kept for the rest of the command unless `refresh` is `True`.
+        """
+        return EC2AutoScale._load_launch_configurations(refresh)[1]
+
+    @staticmethod
+    def get_launch_configurations(refresh=False):
+        """
+        Returns all the `boto.ec2.autoscale.launchconfig.LaunchConfiguration`,
+        including the ones whose name doesn't match any group. They're listed
+        together with `get_launch_configurations_index`.
+        """
+        return EC2AutoScale._load_launch_configurations(refresh)[0]
+
+    @staticmethod
+    def _load_launch_configurations(refresh=False):
+        """
+        Returns the list of all the launch configurations and their index,
+        listing them if it's not been done yet or `refresh` is `True`
+        """
+        with EC2AutoScale._launch_configurations_index_lock:
+            if refresh or EC2AutoScale._launch_configurations_index is None:
+                connection = get_connection('autoscale', AWS.region)
+                launch_configurations = list(paginate(connection.get_all_launch_configurations))
+                index = {}
+                for resource in launch_configurations:
+                    match = EC2AutoScale.LAUNCH_CONFIGURATION_NAME_REGEX.match(resource.name)
+                    if match:
+                        index.setdefault(match.group('group'), []).append(resource)
+
+                for resources in index.values():
+                    resources.sort(
+                        key=lambda resource: EC2AutoScale.launch_configuration_sort_key(resource.name)
+                    )
+                EC2AutoScale._launch_configurations = launch_configurations
+                EC2AutoScale._launch_configurations_index = index
+
+            return (
+                EC2AutoScale._launch_configurations,
+                EC2AutoScale._launch_configurations_index
+            )
+
+    @staticmethod
+    def invalidate_launch_configurations_index():
+        """
+        Forget the launch configurations index, so it's built again the next
+        time it's needed
+        """
+        with EC2AutoScale._launch_configurations_index_lock:
+            EC2AutoScale._launch_configurations = None
+            EC2AutoScale._launch_configurations_index = None
+
 
 class ELB(AWS):
     """
     ELB base class
     """
 
+    # Load balancers index shared by all the instances, see
+    # `get_load_balancers_index`
+    _index = None
+    _index_lock = threading.Lock()
+
     def __init__(self, name, application, configuration=None, resource=None):
         super(ELB, self).__init__(application, configuration, resource)
-        self.elb = ELBConnection()
         self.name = name
 
+    @property
+    def elb(self):
+        return get_connection('elb', self.region)
+
+    @staticmethod
+    def iter_load_balancers():
+        """
+        Generator which yields all the load balancers of the account,
+        requesting the pages lazily
+        """
+        connection = get_connection('elb', AWS.region)
+        return paginate(
+            connection.get_all_load_balancers,
+            token_argument='marker',
+            token_attribute='next_marker'
+        )
+
     @staticmethod
     def get_all_load_balancers():
-        connection = ELBConnection()
-        all_load_balancers = []
-        load_balancers = connection.get_all_load_balancers()
-        all_load_balancers.extend(load_balancers)
+        return list(ELB.iter_load_balancers())
 
-        while load_balancers.is_truncated:
-            load_balancers = connection.get_all_load_balancers()
-            all_load_balancers.extend(load_balancers)
+    @staticmethod
+    def get_load_balancers_index(refresh=False):
+        """
+        Returns a tuple with two dictionaries: load balancer names to
+        `boto.ec2.elb.loadbalancer.LoadBalancer` and instance ids to the
+        names of the load balancers they're registered in.
+
+        The index is built listing all the load balancers once and it's kept
+        for the rest of the command unless `refresh` is `True`.
+        """
+        with ELB._index_lock:
+            if refresh or ELB._index is None:
+                load_balancers = {}
+                instances = {}
+                for load_balancer in ELB.iter_load_balancers():
+                    load_balancers[load_balancer.name] = load_balancer
+                    for instance in load_balancer.instances:
+                        instances.setdefault(instance.id, []).append(load_balancer.name)
+                ELB._index = (load_balancers, instances)
+
+            return ELB._index
 
-        return all_load_balancers
+    @staticmethod
+    def get_load_balancer_names_for_instances(instance_ids):
+        """
+        Returns a dictionary whose keys are `instance_ids` and values the
+        names of the load balancers each instance is registered in
+        """
+        _, instances = ELB.get_load_balancers_index()
+        return dict(
+            (instance_id, instances.get(instance_id, []))
+            for instance_id in instance_ids
+        )
 
 
 class CloudWatch(AWS):
@@ -72,9 +221,9 @@ class CloudWatch(AWS):
     CloudWatch base class
     """
 
-    def __init__(self, application, configuration=None, resource=None):
-        super(CloudWatch, self).__init__(application, configuration, resource)
-        self.cloudwatch = CloudWatchConnection()
+    @property
+    def cloudwatch(self):
+        return get_connection('cloudwatch', self.region)
 
 
 class SNS(AWS):
@@ -82,6 +231,6 @@ class SNS(AWS):
     SNS base class
     """
 
-    def __init__(self, application, configuration=None, resource=None):
-        super(SNS, self).__init__(application, configuration, resource)
-        self.sns = SNSConnection()
+    @property
+    def sns(self):
+        return get_connection('sns', self.region)
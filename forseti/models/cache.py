@@ -0,0 +1,204 @@
+"""
+On-disk cache of AWS describe responses
+"""
+import base64
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class CachedResponse(object):
+    """
+    Response of a request read from the cache. It has the same interface boto
+    uses from `httplib.HTTPResponse` to parse responses.
+    """
+
+    def __init__(self, status, reason, body):
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+    def read(self):
+        return self.body
+
+
+class DescribeCache(object):
+    """
+    Cache of the responses of AWS describe calls stored as files in
+    `directory`. Each call is cached for the seconds given in `ttls` for its
+    action, and calls whose action isn't in `ttls` aren't cached. Once the
+    files take more than `max_size` bytes, the oldest ones are removed.
+
+    Any call to the services in `INVALIDATING_SERVICES` which isn't a read,
+    like creating or deleting a resource, removes all the cached responses,
+    so they don't hide its changes. Calls to other services, like receiving
+    SQS messages or publishing to SNS, don't change what is cached. Unless
+    `read_responses` is set, the cache is only cleared and requests always
+    go to AWS, which is what commands changing resources need.
+
+    It's installed in boto connections with `install`, which is done by
+    `forseti.models.connections.AWSConnectionRegistry` when its `cache` is set.
+    """
+
+    DEFAULT_TTLS = {
+        'DescribeAutoScalingGroups': 30,
+        'DescribeScalingActivities': 30,
+        'DescribeLaunchConfigurations': 300,
+        'DescribeInstances': 60,
+        'DescribeInstanceStatus': 30,
+        'DescribeImages': 3600,
+        'DescribeSnapshots': 3600,
+        'DescribeLoadBalancers': 300,
+        'DescribeInstanceHealth': 15,
+    }
+    DEFAULT_MAX_SIZE = 50 * 1024 * 1024
+    READ_ACTION_PREFIXES = ('Describe', 'List', 'Get')
+    # Services whose changes affect the cached responses
+    INVALIDATING_SERVICES = ('ec2', 'autoscale', 'elb')
+    EXTENSION = '.json'
+
+    def __init__(self, directory, ttls=None, max_size=None, read_responses=True):
+        self.directory = os.path.expanduser(directory)
+        self.ttls = dict(self.DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.max_size = max_size or self.DEFAULT_MAX_SIZE
+        self.read_responses = read_responses
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def _path(self, connection, service, region, action, params, path, verb):
+        """
+        Get the file where the response of a call is cached. Calls are told
+        apart by the credentials, service, region and all the parameters.
+        """
+        key = json.dumps(
+            [
+                connection.aws_access_key_id,
+                service,
+                region,
+                action,
+                sorted((params or {}).items()),
+                path,
+                verb,
+            ]
+        )
+        return os.path.join(
+            self.directory,
+            "%s-%s%s" % (action, hashlib.sha1(key).hexdigest(), self.EXTENSION)
+        )
+
+    def get(self, path, ttl):
+        """
+        Get the `CachedResponse` stored in `path` if it's not older than `ttl`
+        seconds, or `None`
+        """
+        try:
+            if time.time() - os.path.getmtime(path) > ttl:
+                return None
+            with open(path) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        return CachedResponse(entry['status'], entry['reason'], base64.b64decode(entry['body']))
+
+    def set(self, path, status, reason, body):
+        """
+        Stores a response in `path`. The file is written in one go, so
+        concurrent readers never see half an entry.
+        """
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(descriptor, 'w') as cache_file:
+            json.dump(
+                {
+                    'status': status,
+                    'reason': reason,
+                    'body': base64.b64encode(body),
+                },
+                cache_file
+            )
+        os.rename(temporary_path, path)
+        self.evict()
+
+    def _entries(self):
+        return glob.glob(os.path.join(self.directory, '*' + self.EXTENSION))
+
+    def evict(self):
+        """
+        Removes the oldest entries until the cache takes less than `max_size`
+        bytes
+        """
+        entries = []
+        for path in self._entries():
+            try:
+                entries.append((os.path.getmtime(path), os.path.getsize(path), path))
+            except OSError:
+                continue
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            self._remove(path)
+            size -= entry_size
+
+    def clear(self):
+        """
+        Removes all the cached responses
+        """
+        for path in self._entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def is_read_action(self, action):
+        return action.startswith(self.READ_ACTION_PREFIXES)
+
+    def invalidates(self, service, action):
+        """
+        Tells whether calling `action` of `service` changes what is cached
+        """
+        return service in self.INVALIDATING_SERVICES and not self.is_read_action(action)
+
+    def install(self, connection, service, region=None):
+        """
+        Makes `connection`, a boto query connection to `service` in `region`,
+        read and store its describe responses in the cache, and clear it on
+        any call changing them, see `invalidates`
+        """
+        make_request = connection.make_request
+
+        def cached_make_request(action, params=None, path='/', verb='GET'):
+            if self.invalidates(service, action):
+                self.clear()
+                return make_request(action, params, path, verb)
+            if not self.read_responses or action not in self.ttls:
+                return make_request(action, params, path, verb)
+
+            cache_path = self._path(connection, service, region, action, params, path, verb)
+            response = self.get(cache_path, self.ttls[action])
+            if response is not None:
+                self.hits += 1
+                return response
+
+            self.misses += 1
+            response = make_request(action, params, path, verb)
+            body = response.read()
+            if response.status == 200:
+                self.set(cache_path, response.status, response.reason, body)
+
+            return CachedResponse(response.status, response.reason, body)
+
+        connection.make_request = cached_make_request
+
+        return connection
@@ -0,0 +1,124 @@
+"""
+Shared AWS connections
+"""
+import threading
+
+import boto.ec2
+import boto.ec2.autoscale
+import boto.ec2.cloudwatch
+import boto.ec2.elb
+import boto.sns
+import boto.sqs
+from boto.ec2.autoscale import AutoScaleConnection
+from boto.ec2.cloudwatch import CloudWatchConnection
+from boto.ec2.connection import EC2Connection
+from boto.ec2.elb import ELBConnection
+from boto.sns.connection import SNSConnection
+from boto.sqs.connection import SQSConnection
+
+
+class AWSConnectionRegistry(object):
+    """
+    Process wide registry of boto connections keyed by service and region.
+
+    boto connections are not thread safe, so every thread gets its own
+    connection for a given service and region, and reuses it afterwards.
+    The registry keeps count of the connections it created and the times it
+    reused one.
+
+    If `cache` is set to a `forseti.models.cache.DescribeCache`, it's
+    installed in the connections created afterwards.
+    """
+
+    # Connection classes used when no region is given, so boto uses the
+    # region defined in its configuration file
+    CONNECTION_CLASSES = {
+        'ec2': EC2Connection,
+        'autoscale': AutoScaleConnection,
+        'elb': ELBConnection,
+        'cloudwatch': CloudWatchConnection,
+        'sns': SNSConnection,
+        'sqs': SQSConnection,
+    }
+
+    REGION_CONNECTORS = {
+        'ec2': boto.ec2.connect_to_region,
+        'autoscale': boto.ec2.autoscale.connect_to_region,
+        'elb': boto.ec2.elb.connect_to_region,
+        'cloudwatch': boto.ec2.cloudwatch.connect_to_region,
+        'sns': boto.sns.connect_to_region,
+        'sqs': boto.sqs.connect_to_region,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.created = 0
+        self.reused = 0
+        self.cache = None
+
+    def _thread_connections(self):
+        """
+        Returns the dictionary of connections owned by the current thread
+        """
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+        return connections
+
+    def _connect(self, service, region=None):
+        """
+        Creates a new boto connection to `service` in `region`
+        """
+        if service not in self.CONNECTION_CLASSES:
+            raise ValueError("Unknown AWS service %s" % service)
+
+        if region is None:
+            return self.CONNECTION_CLASSES[service]()
+        return self.REGION_CONNECTORS[service](region)
+
+    def get(self, service, region=None):
+        """
+        Get a connection to `service` in `region`. A new connection is only
+        created the first time the current thread asks for it.
+
+        :param service: One of `CONNECTION_CLASSES` keys
+        :param region: AWS region name. By default, the one configured in boto
+        """
+        connections = self._thread_connections()
+        key = (service, region)
+        connection = connections.get(key)
+        if connection is None:
+            connection = self._connect(service, region)
+            if self.cache is not None:
+                self.cache.install(connection, service, region)
+            connections[key] = connection
+            with self._lock:
+                self.created += 1
+        else:
+            with self._lock:
+                self.reused += 1
+
+        return connection
+
+    def stats(self):
+        """
+        Returns a dictionary with the amount of connections handed out,
+        created and reused by the registry
+        """
+        with self._lock:
+            return {
+                'handed_out': self.created + self.reused,
+                'created': self.created,
+                'reused': self.reused,
+            }
+
+
+registry = AWSConnectionRegistry()
+
+
+def get_connection(service, region=None):
+    """
+    Get a connection to `service` in `region` from the shared registry
+    """
+    return registry.get(service, region)
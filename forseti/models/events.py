@@ -0,0 +1,186 @@
+"""
+Autoscale events received from SNS notifications
+"""
+import json
+import math
+import Queue
+import threading
+import time
+
+from boto.sqs.message import RawMessage
+
+from forseti.exceptions import ForsetiConfigurationException
+from forseti.models.connections import get_connection
+from forseti.models.models import EC2AutoScaleNotification
+
+
+class AutoScaleEvent(object):
+    """
+    Autoscale notification of an instance launched or terminated in a group
+    """
+
+    def __init__(self, event_type, instance_id, group_name):
+        self.event_type = event_type
+        self.instance_id = instance_id
+        self.group_name = group_name
+
+    @classmethod
+    def from_message(cls, body):
+        """
+        Builds an event from the body of a message received from a queue
+        subscribed to an autoscale notifications topic. Both SNS envelopes and
+        raw messages are accepted. Returns `None` if the message isn't an
+        autoscale notification.
+        """
+        try:
+            message = json.loads(body)
+            if message.get('Type') == 'Notification':
+                message = json.loads(message['Message'])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        if not isinstance(message, dict) or 'Event' not in message:
+            return None
+
+        return cls(
+            message['Event'],
+            message.get('EC2InstanceId'),
+            message.get('AutoScalingGroupName')
+        )
+
+
+class LocalEventQueue(object):
+    """
+    In-process queue of messages. It can replace `SQSEventQueue` when the
+    notifications are produced by the same process, for instance in tests.
+    """
+
+    def __init__(self):
+        self.queue = Queue.Queue()
+
+    def put(self, body):
+        """
+        Adds a message to the queue
+        """
+        self.queue.put(body)
+
+    def receive(self, timeout, accept=None):
+        """
+        Returns the bodies of the messages in the queue, waiting up to
+        `timeout` seconds for the first one. The queue has a single consumer,
+        so messages not accepted by `accept` are discarded.
+
+        :param accept: Function receiving a message body which returns `True`
+                       if the message must be returned. By default, all of
+                       them are.
+        """
+        try:
+            bodies = [self.queue.get(timeout=max(timeout, 0.01))]
+        except Queue.Empty:
+            return []
+
+        while True:
+            try:
+                bodies.append(self.queue.get_nowait())
+            except Queue.Empty:
+                return [body for body in bodies if accept is None or accept(body)]
+
+
+class SQSEventQueue(object):
+    """
+    SQS queue subscribed to the SNS topic where the autoscale group publishes
+    its notifications
+    """
+
+    # SQS limits
+    MAX_MESSAGES = 10
+    MAX_WAIT_TIME = 20
+
+    def __init__(self, queue_name, region=None):
+        self.queue = get_connection('sqs', region).get_queue(queue_name)
+        if self.queue is None:
+            raise ForsetiConfigurationException("SQS queue %s not found" % queue_name)
+        # SNS messages aren't base64 encoded, which boto expects by default
+        self.queue.set_message_class(RawMessage)
+
+    def receive(self, timeout, accept=None):
+        """
+        Returns the bodies of the messages in the queue, waiting up to
+        `timeout` seconds for the first one using long polling. Accepted
+        messages are deleted once received. The rest are left in the queue,
+        which may be shared with other consumers, and become visible again
+        after its visibility timeout.
+
+        :param accept: Function receiving a message body which returns `True`
+                       if the message must be returned. By default, all of
+                       them are.
+        """
+        messages = self.queue.get_messages(
+            num_messages=self.MAX_MESSAGES,
+            wait_time_seconds=int(math.ceil(min(max(timeout, 0), self.MAX_WAIT_TIME)))
+        )
+        accepted = [
+            message
+            for message in messages
+            if accept is None or accept(message.get_body())
+        ]
+        if accepted:
+            self.queue.delete_message_batch(accepted)
+
+        return [message.get_body() for message in accepted]
+
+
+class AutoScaleEventListener(object):
+    """
+    Consumes the launch and terminate notifications of an autoscale group from
+    a queue. The queue can be any object with a `receive(timeout, accept)`
+    method returning a list of message bodies, like `SQSEventQueue` or
+    `LocalEventQueue`. Only the notifications of the group are taken from the
+    queue, so it can be shared by several groups.
+
+    `wait` can be used as the `sleep` function of a `forseti.utils.Waiter`, so
+    the waiter polls as soon as an event arrives and keeps polling at its
+    own pace when no events come.
+    """
+
+    def __init__(self, queue, group_name):
+        self.queue = queue
+        self.group_name = group_name
+        self.launched = set()
+        self.terminated = set()
+        self._lock = threading.Lock()
+
+    def _record(self, event):
+        with self._lock:
+            if event.event_type == EC2AutoScaleNotification.LAUNCH:
+                self.launched.add(event.instance_id)
+            elif event.event_type == EC2AutoScaleNotification.TERMINATE:
+                self.terminated.add(event.instance_id)
+
+    def receive(self, timeout=0):
+        """
+        Returns the events of the group received in up to `timeout` seconds
+        and records the instances launched and terminated
+        """
+        events = []
+        for body in self.queue.receive(timeout, accept=self._is_group_message):
+            event = AutoScaleEvent.from_message(body)
+            self._record(event)
+            events.append(event)
+
+        return events
+
+    def _is_group_message(self, body):
+        event = AutoScaleEvent.from_message(body)
+        return event is not None and event.group_name == self.group_name
+
+    def wait(self, seconds):
+        """
+        Waits up to `seconds` seconds, returning as soon as some event of the
+        group is received
+        """
+        deadline = time.time() + seconds
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0 or self.receive(remaining):
+                return
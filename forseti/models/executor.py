@@ -0,0 +1,78 @@
+"""
+Asynchronous execution of model operations
+"""
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from forseti.models.identity import bind_identity_scope
+
+
+class ModelExecutor(object):
+    """
+    Runs blocking model operations in a bounded pool of threads, so callers
+    can start several AWS operations and wait for them later. Operations
+    return `concurrent.futures.Future` objects.
+
+    ```
+    activities = group.submit(group.get_activities, 10)
+    health = balancer.submit(balancer.get_instances_health, instances_ids)
+    print activities.result(), health.result()
+    ```
+
+    The pool is created the first time an operation is submitted, with
+    `max_workers` threads, see `resize`. Operations
+    run in the identity scope of the thread submitting them, see
+    `forseti.models.identity.identity_scope`.
+    """
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Runs `function` in the pool and returns a `Future` with its result
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            pool = self._pool
+
+        return pool.submit(bind_identity_scope(function), *args, **kwargs)
+
+    def resize(self, max_workers):
+        """
+        Changes the amount of threads of the pool. Running operations finish
+        in the current pool, and a new one is created for the next ones.
+        """
+        self.max_workers = max_workers
+        self.shutdown()
+
+    def map(self, function, *iterables):
+        """
+        Runs `function` in the pool for each item of `iterables` and returns
+        a list of `Future`, in the same order
+        """
+        return [self.submit(function, *args) for args in zip(*iterables)]
+
+    def shutdown(self, wait=True):
+        """
+        Stops the pool. A new one is created if more operations are submitted.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+executor = ModelExecutor()
+
+
+def gather(futures):
+    """
+    Waits for all the `futures` and returns their results, in the same order
+    """
+    return [future.result() for future in futures]
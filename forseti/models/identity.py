@@ -0,0 +1,109 @@
+"""
+Identity map of model objects
+"""
+from contextlib import contextmanager
+import threading
+
+
+class IdentityMap(object):
+    """
+    Keeps a single object per model class and key, so every lookup of the
+    same resource gets the same object and its state. Objects are kept until
+    the map is cleared, and it's up to them to refresh their AWS data.
+
+    A map can be shared by several threads, see `bind_identity_scope`.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        # Reentrant, as factories may look up other objects
+        self._lock = threading.RLock()
+
+    def get(self, cls, key, factory):
+        """
+        Get the object of `cls` identified by `key`, calling `factory` to
+        create it the first time
+        """
+        identity = (cls, key)
+        with self._lock:
+            if identity not in self.objects:
+                self.objects[identity] = factory()
+            return self.objects[identity]
+
+    def clear(self):
+        with self._lock:
+            self.objects = {}
+
+
+_local = threading.local()
+
+
+def current_identity_map():
+    """
+    Get the `IdentityMap` of the scope active in the current thread, or
+    `None`
+    """
+    return getattr(_local, 'identity_map', None)
+
+
+@contextmanager
+def identity_scope(identity_map=None):
+    """
+    Context manager which makes model objects looked up in the current thread
+    be kept in an `IdentityMap` until it exits. If a scope is already active,
+    its map is reused.
+
+    ```
+    with identity_scope():
+        group = EC2AutoScaleGroup.get(name, application)
+        assert group is EC2AutoScaleGroup.get(name, application)
+    ```
+
+    :param identity_map: `IdentityMap` of a scope of another thread, which is
+                         made active in the current one until it exits
+    """
+    previous_identity_map = current_identity_map()
+    if identity_map is None:
+        if previous_identity_map is not None:
+            yield previous_identity_map
+            return
+        identity_map = IdentityMap()
+
+    _local.identity_map = identity_map
+    try:
+        yield identity_map
+    finally:
+        _local.identity_map = previous_identity_map
+
+
+def bind_identity_scope(function):
+    """
+    Get a function which calls `function` in the scope active in the current
+    thread, if any. It's used to run functions in other threads, so objects
+    they look up are shared with the calling thread.
+
+    ```
+    with identity_scope():
+        executor.submit(bind_identity_scope(deploy))
+    ```
+    """
+    identity_map = current_identity_map()
+    if identity_map is None:
+        return function
+
+    def scoped_function(*args, **kwargs):
+        with identity_scope(identity_map):
+            return function(*args, **kwargs)
+
+    return scoped_function
+
+
+def get_or_create(cls, key, factory):
+    """
+    Get the object of `cls` identified by `key` from the map of the current
+    scope. Without an active scope, a new object is created by `factory`.
+    """
+    identity_map = current_identity_map()
+    if identity_map is None:
+        return factory()
+    return identity_map.get(cls, key, factory)
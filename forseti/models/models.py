@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
+import collections
+import functools
+import itertools
 import json
-import os
-import re
+import socket
+import threading
 import time
 
 from forseti.models.base import (
@@ -11,7 +14,22 @@ from forseti.models.base import (
     ELB,
     SNS,
 )
-from forseti.utils import balloon_timer
+from forseti.models.connections import get_connection
+from forseti.models.executor import gather
+from forseti.models.identity import get_or_create
+from forseti.models.pagination import first, paginate
+from forseti.utils import (
+    StabilityDetector,
+    VersionedNameAllocator,
+    Waiter,
+    balloon_timer,
+    run_command,
+    run_concurrently,
+)
+from forseti.ssh import (
+    ParallelSSHExecutor,
+    SSHConnectionPool,
+)
 from forseti.exceptions import (
     EC2InstanceException,
     EC2AutoScaleException,
@@ -41,7 +59,7 @@ class Application(object):
     @property
     def autoscale_group(self):
         try:
-            return EC2AutoScaleGroup(
+            return EC2AutoScaleGroup.get(
                 self.forseti_configuration.get_autoscale_group(self.name),
                 self.name,
                 self.forseti_configuration.get_autoscale_group_configuration(self.name)
@@ -71,16 +89,68 @@ class EC2Instance(EC2):
     EC2 Instance
     """
 
+    # Maximum amount of instance ids requested in a single DescribeInstances
+    LOAD_MANY_CHUNK_SIZE = 100
+
+    # `forseti.utils.Waiter` parameters used while an image is being created
+    IMAGE_WAIT = {
+        'interval': 5,
+        'backoff': 1.5,
+        'jitter': 0.1,
+        'max_interval': 30,
+        'timeout': 60 * 60,
+    }
+
     def __init__(
-        self, application, configuration=None, resource=None, instance_id=None
+        self, application, configuration=None, resource=None, instance_id=None,
+        instance=None
     ):
+        """
+        :param resource: `boto.ec2.instance.Reservation` of the instance
+        :param instance_id: Id of an existing instance to be fetched from AWS
+        :param instance: Existing `boto.ec2.instance.Instance`. If given, the
+                         instance won't be fetched again.
+        """
         super(EC2Instance, self).__init__(application, configuration, resource)
         self.instance_id = instance_id
-        if self.instance_id:
+        self.instance = instance
+        if self.instance:
+            self.instance_id = self.instance.id
+        elif self.instance_id:
             self.resource = self.ec2.get_all_instances(instance_ids=[self.instance_id])[0]
             self.instance = self.resource.instances[0]
-        else:
-            self.instance = None
+
+    @classmethod
+    def load_many(cls, application, instance_ids):
+        """
+        Get a list of `EC2Instance` from a list of instance ids, requesting
+        them to AWS in chunks of `LOAD_MANY_CHUNK_SIZE` ids. The list keeps
+        the order of `instance_ids` and skips instances not found.
+
+        :param application: Application name
+        :param instance_ids: List of instance ids
+        """
+        instance_ids = list(instance_ids)
+        if not instance_ids:
+            return []
+
+        connection = get_connection('ec2', cls.region)
+        instances = {}
+        for start in range(0, len(instance_ids), cls.LOAD_MANY_CHUNK_SIZE):
+            chunk = instance_ids[start:start + cls.LOAD_MANY_CHUNK_SIZE]
+            for reservation in connection.get_all_instances(instance_ids=chunk):
+                for instance in reservation.instances:
+                    instances[instance.id] = cls(
+                        application,
+                        resource=reservation,
+                        instance=instance
+                    )
+
+        return [
+            instances[instance_id]
+            for instance_id in instance_ids
+            if instance_id in instances
+        ]
 
     def load_balancers(self):
         """
@@ -89,15 +159,10 @@ class EC2Instance(EC2):
         if not self.instance_id:
             return []
 
-        load_balancers = []
-        all_load_balancers = ELB.get_all_load_balancers()
+        load_balancers, _ = ELB.get_load_balancers_index()
+        names = ELB.get_load_balancer_names_for_instances([self.instance_id])
 
-        for load_balancer in all_load_balancers:
-            instances = [instance.id for instance in load_balancer.instances]
-            if self.instance_id in instances:
-                load_balancers.append(load_balancer)
-
-        return load_balancers
+        return [load_balancers[name] for name in names[self.instance_id]]
 
     def launch(self):
         """
@@ -131,46 +196,40 @@ class EC2Instance(EC2):
         """
         Create an AMI from a running instance
         """
-        with balloon_timer("Instance %s creating image" % self.instance.id) as balloon:
-            i = 0
-
-            # FIXME: Sometimes, if the ami was created by forseti but couldn't
-            # tag it, we may have an error. It would be better to look for amis
-            # with the same name
-            amis = self.ec2.get_all_images(
-                owners=['self'],
-                filters={
-                    'tag:forseti:application': self.application,
-                    'tag:forseti:date': self.today,
-                }
+        ami_prefix = "%s-ami-%s" % (self.application, self.today)
+        amis = self.ec2.get_all_images(
+            owners=['self'],
+            filters={'name': '%s-*' % ami_prefix}
+        )
+        allocator = VersionedNameAllocator(ami_prefix, [ami.name for ami in amis])
+        ami_name, ami_id = allocator.allocate(
+            lambda name: self.instance.create_image(
+                name,
+                description=name,
+                no_reboot=no_reboot
+            ),
+            lambda exception: (
+                isinstance(exception, EC2ResponseError) and
+                'is already in use by AMI' in exception.message
             )
-            success = False
-            counter = len(amis)
-            while not success:
-                counter = counter + 1
-                ami_name = "%s-ami-%s-%s" % (self.application, self.today, counter)
-                try:
-                    ami_id = self.instance.create_image(
-                        ami_name,
-                        description=ami_name,
-                        no_reboot=no_reboot
-                    )
-                    success = True
-                except EC2ResponseError as exception:
-                    if 'is already in use by AMI' not in exception.message:
-                        raise
-
-            balloon.update(i)
-            i += 1
-            time.sleep(1)
-            ami = self.ec2.get_all_images(image_ids=(ami_id,))[0]
-
-            while ami.update() == "pending":
-                balloon.update(i)
-                i += 1
-                time.sleep(1)
-
-        if ami.update() == "available":
+        )
+
+        def image_is_not_pending():
+            try:
+                ami = self.ec2.get_image(ami_id)
+            except EC2ResponseError:
+                # The image may not be found just after creating it
+                return None
+            if ami and ami.state != "pending":
+                return ami
+            return None
+
+        ami = Waiter(**self.IMAGE_WAIT).wait(
+            image_is_not_pending,
+            "Instance %s creating image" % self.instance.id
+        )
+
+        if ami.state == "available":
             ami.add_tag("Name", ami_name)
             ami.add_tag('forseti:application', self.application)
             ami.add_tag('forseti:date', self.today)
@@ -205,6 +264,23 @@ class GoldenEC2Instance(EC2Instance):
     application AMI.
     """
     TIMEOUT = 2
+    SSH_PORT = 22
+
+    # `forseti.utils.Waiter` parameters used while the instance boots
+    LAUNCH_WAIT = {
+        'interval': 2,
+        'backoff': 1.5,
+        'jitter': 0.1,
+        'max_interval': 10,
+        'timeout': 10 * 60,
+    }
+    SSH_WAIT = {
+        'interval': 1,
+        'backoff': 1.5,
+        'jitter': 0.1,
+        'max_interval': 5,
+        'timeout': 10 * 60,
+    }
 
     def __init__(self, application, configuration=None):
         """
@@ -218,8 +294,8 @@ class GoldenEC2Instance(EC2Instance):
             'key_filename': self.provision_configuration['key_filename'],
             'timeout': self.TIMEOUT,
         }
-        self.ssh = paramiko.SSHClient()
-        self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        # Authenticated `paramiko.SSHClient` opened by `wait_for_ssh`
+        self.ssh = None
 
         super(GoldenEC2Instance, self).__init__(application, configuration)
         # No need to monitor an instance that will be terminated soon
@@ -230,14 +306,12 @@ class GoldenEC2Instance(EC2Instance):
         Launch a golden instance and wait until it's running.
         """
         self.launch()
-        with balloon_timer("Golden instance %s launched. Waiting until it's running" % self.instance.id) as balloon:
-            i = 0
-            while self.instance.update() == "pending":
-                balloon.update(i)
-                i += 1
-                time.sleep(1)
-
-        if self.instance.update() == "running":
+        Waiter(**self.LAUNCH_WAIT).wait(
+            lambda: self.instance.update() != "pending",
+            "Golden instance %s launched. Waiting until it's running" % self.instance.id
+        )
+
+        if self.instance.state == "running":
             tag_name = "golden-%s-instance-%s" % (self.application, self.today)
             self.instance.add_tag('Name', tag_name)
             self.instance.add_tag('forseti:golden-instance', True)
@@ -248,49 +322,117 @@ class GoldenEC2Instance(EC2Instance):
                 "Golden instance %s could not be launched" % self.instance.id
             )
 
-    def is_ssh_running(self):
+    def is_ssh_port_open(self):
+        """
+        Check if the SSH port accepts TCP connections. It's much cheaper than
+        opening an SSH session, so it's checked first while the instance boots.
+        """
+        try:
+            connection = socket.create_connection(
+                (self.instance.public_dns_name, self.SSH_PORT),
+                timeout=self.TIMEOUT
+            )
+        except (socket.error, socket.timeout):
+            return False
+
+        connection.close()
+        return True
+
+    def open_ssh_session(self):
         """
-        Check if SSH is running and working
+        Open an authenticated SSH session and keep it in `ssh`. Returns `False`
+        if it could not be opened.
         """
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         try:
-            self.ssh.connect(self.instance.public_dns_name, **self.ssh_configuration)
-            self.ssh.exec_command('ls')
-        except:
+            client.connect(self.instance.public_dns_name, **self.ssh_configuration)
+        except Exception:
+            client.close()
             return False
+
+        self.ssh = client
         return True
 
+    def close_ssh_session(self):
+        """
+        Close the SSH session opened by `open_ssh_session`, if any
+        """
+        if self.ssh:
+            self.ssh.close()
+            self.ssh = None
+
+    def is_ssh_running(self):
+        """
+        Check if SSH is running and working. The SSH port is checked first and,
+        once it's open, an authenticated session is opened and kept in `ssh`.
+        """
+        if self.ssh and self.ssh.get_transport() and self.ssh.get_transport().is_active():
+            return True
+
+        return self.is_ssh_port_open() and self.open_ssh_session()
+
     def wait_for_ssh(self):
         """
         Wait until SSH is running
         """
-        with balloon_timer("Golden instance %s provisioned. Waiting until SSH is up" % self.instance.id) as balloon:
-            i = 0
-            while not self.is_ssh_running():
-                balloon.update(i)
-                i += 1
-                time.sleep(1)
+        Waiter(**self.SSH_WAIT).wait(
+            self.is_ssh_running,
+            "Golden instance %s provisioned. Waiting until SSH is up" % self.instance.id
+        )
+
+    def run_ssh_commands(self, commands):
+        """
+        Run `commands` in order in the instance using a `ParallelSSHExecutor`
+        which reuses the SSH session opened by `wait_for_ssh`. Raises
+        `EC2InstanceException` if any command doesn't return 0.
+        """
+        pool = SSHConnectionPool(
+            self.ssh_configuration['username'],
+            self.ssh_configuration['key_filename']
+        )
+        pool.add(self.instance.public_dns_name, self.ssh)
+        executor = ParallelSSHExecutor(pool, max_workers=1)
+        result = executor.run([self.instance.public_dns_name], commands)[0]
+        executor.print_summary()
+        if not result.succeeded:
+            raise EC2InstanceException(
+                "Command `%s` failed in golden instance %s" %
+                (result.failed_command, self.instance.id)
+            )
 
     def provision(self, deployer_args=None):
         """
         Provisions machine using `command` specified in configuration file,
         `command` is executed locally within `working_directory` specified path.
+        If a list of `remote_commands` is specified, they're executed
+        afterwards in the instance reusing the SSH session used to check it
+        was up, see `run_ssh_commands`.
 
         Some extra arguments can be passed to the command by
         using `deployer_args`
         """
         self.wait_for_ssh()
-        with balloon_timer("Deployed new code on golden instance %s" % self.instance.id) as balloon:
-            command = self.provision_configuration['command'].format(
-                dns_name=self.instance.public_dns_name
-            )
-            if deployer_args:
-                # `deployer_args` is supposed to be a string
-                command = '%s %s' % (command, deployer_args)
+        try:
+            with balloon_timer("Deployed new code on golden instance %s" % self.instance.id) as balloon:
+                command = self.provision_configuration['command'].format(
+                    dns_name=self.instance.public_dns_name
+                )
+                if deployer_args:
+                    # `deployer_args` is supposed to be a string
+                    command = '%s %s' % (command, deployer_args)
+
+                exit_code = run_command(command, self.provision_configuration['working_directory'])
+                if exit_code != 0:
+                    raise EC2InstanceException(
+                        "Command `%s` returned %s provisioning golden instance %s" %
+                        (command, exit_code, self.instance.id)
+                    )
 
-            former_directory = os.getcwd()
-            os.chdir(self.provision_configuration['working_directory'])
-            os.system(command)
-            os.chdir(former_directory)
+                if 'remote_commands' in self.provision_configuration:
+                    self.run_ssh_commands(self.provision_configuration['remote_commands'])
+        finally:
+            self.close_ssh_session()
 
 
 class EC2AMI(EC2):
@@ -298,9 +440,25 @@ class EC2AMI(EC2):
     EC2 AMI
     """
 
-    def __init__(self, application, ami_id, configuration=None, resource=None):
+    # Maximum amount of ids requested in a single describe call
+    LOAD_MANY_CHUNK_SIZE = 100
+    # Errors returned when some of the requested images or snapshots don't
+    # exist anymore
+    NOT_FOUND_ERRORS = (
+        'InvalidAMIID.NotFound',
+        'InvalidAMIID.Unavailable',
+        'InvalidSnapshot.NotFound',
+    )
+
+    def __init__(self, application, ami_id, configuration=None, resource=None, snapshot=None):
+        """
+        :param resource: `boto.ec2.image.Image` of the AMI
+        :param snapshot: `boto.ec2.snapshot.Snapshot` of the AMI. If given,
+                         the snapshot won't be fetched again.
+        """
         super(EC2AMI, self).__init__(application, configuration, resource)
         self.ami_id = ami_id
+        self.snapshot = snapshot
 
     @property
     def snapshot_id(self):
@@ -316,9 +474,77 @@ class EC2AMI(EC2):
         if not self.snapshot_id:
             return None
 
-        snapshots = self.ec2.get_all_snapshots(snapshot_ids=[self.snapshot_id])
+        if self.snapshot is None:
+            snapshots = self.ec2.get_all_snapshots(snapshot_ids=[self.snapshot_id])
+            self.snapshot = snapshots[0] if snapshots else None
+
+        return self.snapshot
+
+    @classmethod
+    def load_many(cls, application, ami_ids):
+        """
+        Get a dictionary whose keys are `ami_ids` and values `EC2AMI` with
+        their image and snapshot. Images and snapshots are requested with a
+        describe call per `LOAD_MANY_CHUNK_SIZE` ids. AMIs or snapshots
+        which don't exist anymore have their `resource` or `snapshot` set to
+        `None`.
+
+        :param application: Application name
+        :param ami_ids: List of AMI ids
+        """
+        ami_ids = list(set(ami_ids))
+        connection = get_connection('ec2', cls.region)
+
+        images = {}
+        for start in range(0, len(ami_ids), cls.LOAD_MANY_CHUNK_SIZE):
+            chunk = ami_ids[start:start + cls.LOAD_MANY_CHUNK_SIZE]
+            for image in cls._describe_existing(
+                lambda ids: connection.get_all_images(image_ids=ids),
+                chunk
+            ):
+                images[image.id] = image
+
+        amis = dict(
+            (ami_id, cls(application, ami_id, resource=images.get(ami_id)))
+            for ami_id in ami_ids
+        )
+
+        snapshot_ids = list(set(ami.snapshot_id for ami in amis.values() if ami.snapshot_id))
+        snapshots = {}
+        for start in range(0, len(snapshot_ids), cls.LOAD_MANY_CHUNK_SIZE):
+            chunk = snapshot_ids[start:start + cls.LOAD_MANY_CHUNK_SIZE]
+            for snapshot in cls._describe_existing(
+                lambda ids: connection.get_all_snapshots(snapshot_ids=ids),
+                chunk
+            ):
+                snapshots[snapshot.id] = snapshot
+
+        for ami in amis.values():
+            ami.snapshot = snapshots.get(ami.snapshot_id)
+
+        return amis
 
-        return snapshots[0] if snapshots else None
+    @classmethod
+    def _describe_existing(cls, describe, ids):
+        """
+        Calls `describe` with the list of `ids` and returns its result. AWS
+        fails the whole call when any of the ids doesn't exist, so the ids it
+        reports as not found are dropped and `describe` is called again.
+        """
+        ids = list(ids)
+        while ids:
+            try:
+                return describe(ids)
+            except BotoServerError as exception:
+                if exception.error_code not in cls.NOT_FOUND_ERRORS:
+                    raise
+                message = exception.message or exception.body or ''
+                missing = set(resource_id for resource_id in ids if resource_id in message)
+                if not missing:
+                    raise
+                ids = [resource_id for resource_id in ids if resource_id not in missing]
+
+        return []
 
     def delete(self):
         """
@@ -343,22 +569,29 @@ class EC2AutoScaleConfig(EC2AutoScale):
         the autocale configuration `name` property by appending the current
         date and a version
         """
-        version = 1
-        found = False
-        while not found:
-            name = "%s-%s" % (self.generated_name, version)
-            launch_configurations = self.autoscale.get_all_launch_configurations(names=[name])
-            if launch_configurations:
-                version += 1
-            else:
-                found = True
+        existing_names = [
+            resource.name
+            for resource in self.get_launch_configurations_index().get(self.name, [])
+        ]
+        allocator = VersionedNameAllocator(self.generated_name, existing_names)
+        self.name, self.resource = allocator.allocate(
+            self._create_launch_configuration,
+            lambda exception: (
+                isinstance(exception, BotoServerError) and
+                exception.error_code == 'AlreadyExists'
+            )
+        )
+        self.invalidate_launch_configurations_index()
 
-        self.name = name
+    def _create_launch_configuration(self, name):
+        """
+        Creates a launch configuration named `name` in AWS
+        """
         launch_configuration = LaunchConfiguration(
-            name=self.name,
+            name=name,
             **self.configuration
         )
-        self.resource = self.autoscale.create_launch_configuration(launch_configuration)
+        return self.autoscale.create_launch_configuration(launch_configuration)
 
     def delete(self):
         """
@@ -370,6 +603,7 @@ class EC2AutoScaleConfig(EC2AutoScale):
             print "The AMI %s could not be deleted" % self.resource.image_id
 
         self.autoscale.delete_launch_configuration(self.name)
+        self.invalidate_launch_configurations_index()
 
     def ami(self):
         """
@@ -387,10 +621,75 @@ class EC2AutoScaleGroup(EC2AutoScale):
     EC2 autoscale group
     """
 
+    # Maximum amount of activities included in the status
+    MAX_ACTIVITIES = 50
+
+    # Maximum amount of load balancers waited for at the same time
+    MAX_BALANCER_WORKERS = 4
+
+    # New instances are ready when they've been healthy in `observations`
+    # consecutive polls within `window` seconds
+    HEALTH_STABILITY = {
+        'observations': 3,
+        'window': 60,
+    }
+
+    # `forseti.utils.Waiter` parameters used while the group scales out
+    CAPACITY_WAIT = {
+        'interval': 1,
+        'backoff': 1.5,
+        'jitter': 0.1,
+        'max_interval': 5,
+        'timeout': 5 * 60,
+    }
+    NEW_INSTANCES_WAIT = {
+        'interval': 2,
+        'backoff': 1.5,
+        'jitter': 0.1,
+        'max_interval': 15,
+        'timeout': 30 * 60,
+    }
+    # When autoscale events are received, the group is only polled when an
+    # event arrives or as a fallback every `interval` seconds
+    NEW_INSTANCES_EVENTS_WAIT = {
+        'interval': 15,
+        'jitter': 0.1,
+        'timeout': 30 * 60,
+    }
+
     def __init__(self, name, application, configuration=None, resource=None):
         super(EC2AutoScaleGroup, self).__init__(name, application, configuration, resource)
         self.group = None
         self.elbs = []
+        # `forseti.models.events.AutoScaleEventListener` used to wait for new
+        # instances. If not set, the group is polled.
+        self.event_listener = None
+        self.health_stability = dict(self.HEALTH_STABILITY)
+        # Dictionary with `batch_size` and `max_surge` keys. If set, instances
+        # are replaced in waves, see `apply_launch_configuration_rolling`.
+        self.rolling_deployment = None
+        # Instances replaced per minute in the last deployment
+        self.throughput = None
+
+    @classmethod
+    def get(cls, name, application, configuration=None):
+        """
+        Get the autoscale group `name` from the identity map of the current
+        scope, see `forseti.models.identity.identity_scope`. The group keeps
+        its state between lookups, and `configuration`, if given, replaces
+        the one it had.
+        """
+        group = get_or_create(cls, name, lambda: cls(name, application, configuration))
+        if configuration is not None:
+            group.configuration = configuration
+        return group
+
+    def refresh(self):
+        """
+        Requests the `boto.ec2.autoscale.group.AutoScalingGroup` again
+        """
+        self.group = self._get_autoscaling_group()
+        return self
 
     def set_launch_configuration(self, launch_configuration):
         """
@@ -408,23 +707,31 @@ class EC2AutoScaleGroup(EC2AutoScale):
         Returns a current `boto.ec2.autoscale.group.AutoScalingGroup` instance
         associated to the instance of this class
         """
-        groups = self.autoscale.get_all_groups(names=[self.name])
-        if groups:
-            return groups[0]
-        return None
+        return first(self.autoscale.get_all_groups, names=[self.name])
 
-    def load_balancers(self):
+    def load_balancers(self, group=None, refresh=False):
         """
         Returns a list of `ELBBalancer` instances associated to the autoscale
         group
+
+        :param group: `boto.ec2.autoscale.group.AutoScalingGroup` to take the
+                      balancers from. By default, the last one requested, see
+                      `refresh`.
+        :param refresh: Request the group again before taking its balancers.
+                        Code changing the balancers or their instances must
+                        set it, so it doesn't use an outdated list.
         """
-        self.group = self._get_autoscaling_group()
-        if not self.group.load_balancers:
+        if group is None:
+            if refresh or self.group is None:
+                self.refresh()
+            group = self.group
+        if group is None or not group.load_balancers:
             return None
-        if self.elbs:
-            return self.elbs
-        for balancer in self.group.load_balancers:
-            self.elbs.append(ELBBalancer(balancer, self.application))
+        if [elb.name for elb in self.elbs] != list(group.load_balancers):
+            self.elbs = [
+                ELBBalancer.get(balancer, self.application)
+                for balancer in group.load_balancers
+            ]
         return self.elbs
 
     def get_instances_with_status(self, status):
@@ -441,7 +748,10 @@ class EC2AutoScaleGroup(EC2AutoScale):
             return []
 
         instances = []
-        instances_states = self.ec2.get_all_instance_status(instances_ids)
+        instances_states = paginate(
+            self.ec2.get_all_instance_status,
+            instance_ids=instances_ids
+        )
         for state in instances_states:
             if state.state_name == status:
                 instances.append(state.id)
@@ -453,38 +763,39 @@ class EC2AutoScaleGroup(EC2AutoScale):
         group whose status matches `status`
         """
         running_instances_ec2_names = self.get_instances_with_status(status)
+        instances = EC2Instance.load_many(self.application, running_instances_ec2_names)
 
-        dns_names = []
-        for instance_id in running_instances_ec2_names:
-            dns_names.append(
-                EC2Instance(
-                    self.application,
-                    configuration=None,
-                    instance_id=instance_id
-                ).instance.public_dns_name
-            )
-        return dns_names
+        return [instance.instance.public_dns_name for instance in instances]
 
-    def increase_desired_capacity(self):
-        """
-        Increases the autoscale group desired capacity and max_size, this
-        implies launching new EC2 instances
+    def increase_desired_capacity(self, desired=None):
         """
-        with balloon_timer("Increasing desired capacity to provision new machines") as balloon:
+        Increases the autoscale group desired capacity and, if needed,
+        max_size, this implies launching new EC2 instances
 
-            current_instances = self.get_instances_with_status('running')
-            self.old_instances = current_instances
+        :param desired: New desired capacity. By default, twice the running
+                        instances.
+        """
+        current_instances = self.get_instances_with_status('running')
+        self.old_instances = current_instances
 
+        if desired is None:
             desired = len(current_instances) * 2
-            i = 0
-            while self.group.desired_capacity != desired:
-                self.group.desired_capacity = desired
-                self.group.max_size = self.group.max_size * 2
-                self.group.update()
-                balloon.update(i)
-                i += 1
-                time.sleep(1)
-                self.group = self._get_autoscaling_group()
+        self.group = self._get_autoscaling_group()
+        max_size = max(self.group.max_size, desired)
+
+        def desired_capacity_applied():
+            if self.group.desired_capacity == desired:
+                return True
+            self.group.desired_capacity = desired
+            self.group.max_size = max_size
+            self.group.update()
+            self.group = self._get_autoscaling_group()
+            return self.group.desired_capacity == desired
+
+        Waiter(**self.CAPACITY_WAIT).wait(
+            desired_capacity_applied,
+            "Increasing desired capacity to provision new machines"
+        )
 
     def suspend_processes(self, scaling_processes=None):
         """
@@ -502,85 +813,235 @@ class EC2AutoScaleGroup(EC2AutoScale):
         if self.group:
             self.group.resume_processes(scaling_processes)
 
+    def wait_for_instances_with_health_in_load_balancers(
+        self, instances_ids, health='InService', elbs=None, stability=None, on_stable=None
+    ):
+        """
+        Wait until the instances have `health` in all the load balancers of
+        the group. Balancers are waited for concurrently, and if one of them
+        times out the rest of the waits are cancelled.
+
+        :param elbs: List of `ELBBalancer`. By default, `load_balancers()`
+        :param stability: Dictionary with `observations` and `window` keys. If
+                          given, instances must be stable in the balancers,
+                          see `ELBBalancer.wait_for_instances_stable`.
+        :param on_stable: Function called with the id of each instance as soon
+                          as it's stable in all the balancers. Requires
+                          `stability`.
+        """
+        elbs = elbs or self.load_balancers() or []
+        if not elbs:
+            return
+
+        instances_ids = list(instances_ids)
+        if stability:
+            stable_balancers = collections.Counter()
+            lock = threading.Lock()
+
+            def on_balancer_stable(instance_id):
+                with lock:
+                    stable_balancers[instance_id] += 1
+                    stable = stable_balancers[instance_id] == len(elbs)
+                if stable and on_stable:
+                    on_stable(instance_id)
+
+            waits = [
+                functools.partial(
+                    elb.wait_for_instances_stable,
+                    instances_ids,
+                    health=health,
+                    show_progress=False,
+                    on_stable=on_balancer_stable,
+                    **stability
+                )
+                for elb in elbs
+            ]
+        else:
+            waits = [
+                functools.partial(
+                    elb.wait_for_instances_with_health,
+                    instances_ids,
+                    health=health,
+                    show_progress=False
+                )
+                for elb in elbs
+            ]
+
+        run_concurrently(
+            waits,
+            "Waiting for %d instances until they're in the balancers %s with status %s" % (
+                len(instances_ids),
+                ", ".join([elb.name for elb in elbs]),
+                health
+            ),
+            max_workers=self.MAX_BALANCER_WORKERS
+        )
+
     def deregister_instance_from_load_balancers(self, instances, wait=True):
         """
         Deregister instances in the ELB of the autoscale group
         """
-        elbs = self.load_balancers()
+        elbs = self.load_balancers(refresh=True)
         if elbs:
             instances_ids = [instance.instance_id for instance in instances]
             for elb in elbs:
                 elb.deregister_instances(instances_ids)
-                if wait:
-                    elb.wait_for_instances_with_health(
-                        instances_ids,
-                        health='OutOfService'
-                    )
+            if wait:
+                self.wait_for_instances_with_health_in_load_balancers(
+                    instances_ids,
+                    health='OutOfService',
+                    elbs=elbs
+                )
 
     def register_instance_in_load_balancers(self, instances, wait=True):
         """
         Register instances in the ELB of the autoscale group
         """
-        elbs = self.load_balancers()
+        elbs = self.load_balancers(refresh=True)
         if elbs:
             instances_ids = [instance.instance_id for instance in instances]
             for elb in elbs:
                 elb.register_instances(instances_ids)
-                if wait:
-                    elb.wait_for_instances_with_health(
-                        instances_ids,
-                        health='InService'
-                    )
+            if wait:
+                self.wait_for_instances_with_health_in_load_balancers(
+                    instances_ids,
+                    health='InService',
+                    elbs=elbs
+                )
 
-    def wait_for_new_instances_ready(self):
+    def wait_for_new_instances_ready(self, expected_instances=None, on_instance_ready=None):
         """
         Wait for instances launched by autoscale group to be up, running and in
-        the balancer
-        """
-        with balloon_timer("Waiting for new instances until they're up and running") as balloon:
-            i = 0
-            while len(self.get_instances_with_status('running')) != self.group.desired_capacity:
-                balloon.update(i)
-                i += 1
-                time.sleep(1)
-
-        # TODO: Query AWS for instances
-        instances = self.get_instances_with_status('running')
-        new_instances = set(instances) - set(self.old_instances)
+        the balancer. If the group has an `event_listener`, instances are
+        checked as soon as launch notifications arrive. New instances are the
+        running ones which weren't running in `increase_desired_capacity`.
+
+        :param expected_instances: Amount of new instances to wait for. By
+                                   default, the desired capacity minus the
+                                   instances running before increasing it.
+        :param on_instance_ready: Function called with the id of each new
+                                  instance as soon as it's stable in all the
+                                  balancers, or running if there are none
+        """
+        if self.event_listener:
+            waiter = Waiter(sleep=self.event_listener.wait, **self.NEW_INSTANCES_EVENTS_WAIT)
+        else:
+            waiter = Waiter(**self.NEW_INSTANCES_WAIT)
+        if expected_instances is None:
+            expected_instances = self.group.desired_capacity - len(self.old_instances)
 
-        # Ask the balancer to wait
-        for balancer in self.load_balancers():
-            balancer.wait_for_instances_with_health(new_instances)
+        def get_new_instances():
+            return set(self.get_instances_with_status('running')) - set(self.old_instances)
 
-        # We do it twice, because sometimes the balancer health check is a bit tricky.
-        with balloon_timer("Waiting for another balancer health check pass") as balloon:
-            for i in range(1, self.load_balancers()[0].get_health_check_interval()):
-                balloon.update(i)
-                time.sleep(1)
+        waiter.wait(
+            lambda: len(get_new_instances()) >= expected_instances,
+            "Waiting for %d new instances until they're up and running" % expected_instances
+        )
+        new_instances = get_new_instances()
+
+        # The balancer health check is a bit tricky, so instances must be
+        # healthy during several health checks in a row
+        elbs = self.load_balancers(refresh=True)
+        if not elbs and on_instance_ready:
+            for instance_id in new_instances:
+                on_instance_ready(instance_id)
+        self.wait_for_instances_with_health_in_load_balancers(
+            new_instances,
+            elbs=elbs,
+            stability=self.health_stability,
+            on_stable=on_instance_ready
+        )
+        for elb in elbs or []:
+            print "Instances converged in balancer %s after %d seconds" % (
+                elb.name,
+                elb.convergence_time
+            )
 
-        for balancer in self.load_balancers():
-            balancer.wait_for_instances_with_health(new_instances)
+    def terminate_instance(self, instance_id):
+        """
+        Terminate an instance of the autoscale group decrementing its
+        desired capacity
+        """
+        try:
+            self.autoscale.terminate_instance(
+                instance_id,
+                decrement_capacity=True
+            )
+        except BotoServerError:
+            pass
 
-    def terminate_instances(self, instances_ids):
+    def terminate_instances(self, instances_ids, restore_max_size=True):
         """
         Terminate instances that we no longer want in the autoscale group, the
-        old ones
+        old ones. Instances are terminated concurrently.
+
+        :param restore_max_size: Whether to restore the group max_size from
+                                 the configuration afterwards
         """
-        with balloon_timer("Terminating old instances") as balloon:
-            for instance_id in instances_ids:
-                try:
-                    self.autoscale.terminate_instance(
-                        instance_id,
-                        decrement_capacity=True
-                    )
-                except BotoServerError:
-                    pass
+        with balloon_timer("Terminating old instances"):
+            gather([
+                self.submit(self.terminate_instance, instance_id)
+                for instance_id in instances_ids
+            ])
+
+        if restore_max_size:
+            self.restore_max_size()
 
+    def restore_max_size(self):
+        """
+        Restores the group max_size from the configuration, once the
+        deployment doesn't need more instances
+        """
         # Force an updated group instance to be sure the update is done correctly
         self.group = self._get_autoscaling_group()
         self.group.max_size = self.configuration['max_size']
         self.group.update()
 
+    def retire_instance(self, instance_id):
+        """
+        Terminate an instance through the autoscale group decrementing its
+        desired capacity. The group deregisters the instance from its
+        balancers and drains its connections before terminating it.
+        """
+        self.autoscale.terminate_instance(instance_id, decrement_capacity=True)
+
+    def swap_instances(self, old_instances_ids, expected_instances=None):
+        """
+        Replace `old_instances_ids` with the instances launched by the group
+        after `increase_desired_capacity`. Each time a new instance is ready,
+        see `wait_for_new_instances_ready`, one old instance is retired in the
+        background, see `retire_instance`. It returns when all the new
+        instances are ready and all the old ones have been retired.
+
+        :param expected_instances: Amount of new instances launched by the
+                                   group, see `wait_for_new_instances_ready`
+        """
+        pending_instances = list(old_instances_ids)
+        retirements = []
+        lock = threading.Lock()
+
+        def retire_next(instance_id):
+            with lock:
+                if not pending_instances:
+                    return
+                old_instance_id = pending_instances.pop(0)
+            print "Instance %s is ready, retiring instance %s" % (instance_id, old_instance_id)
+            retirements.append(self.submit(self.retire_instance, old_instance_id))
+
+        self.wait_for_new_instances_ready(
+            expected_instances=expected_instances,
+            on_instance_ready=retire_next
+        )
+
+        with lock:
+            remaining_instances, pending_instances[:] = list(pending_instances), []
+        retirements.extend(
+            self.submit(self.retire_instance, instance_id)
+            for instance_id in remaining_instances
+        )
+        with balloon_timer("Retiring old instances"):
+            gather(retirements)
+
     def apply_launch_configuration_for_deployment(self):
         """
         Applies changes to current autoscale group launch configuration for
@@ -588,15 +1049,83 @@ class EC2AutoScaleGroup(EC2AutoScale):
 
         * First, increases desired capacity, therefore autoscale group grows
         with the new launch configuration.
-        * Then, we wait for the new instances being booted to be ready and in
-        the balancer.
-        * Finally, we terminate older instances by restoring initial capacity
-        in autoscale group.
+        * Then, each time a new instance is ready in the balancer, an older
+        instance is drained and terminated, restoring initial capacity in
+        autoscale group, see `swap_instances`.
+
+        If `rolling_deployment` is set, instances are replaced in waves
+        instead, see `apply_launch_configuration_rolling`.
         """
+        if self.rolling_deployment:
+            return self.apply_launch_configuration_rolling(**self.rolling_deployment)
+
+        start = time.time()
         instances_ids = self.get_instances_with_status('running')
         self.increase_desired_capacity()
-        self.wait_for_new_instances_ready()
-        self.terminate_instances(instances_ids)
+        self.swap_instances(instances_ids)
+        self.restore_max_size()
+        self.print_throughput(len(instances_ids), time.time() - start)
+
+    def apply_launch_configuration_rolling(self, batch_size, max_surge):
+        """
+        Applies changes to current autoscale group launch configuration by
+        replacing its instances in waves of `batch_size` instances. There are
+        never more than `max_surge` instances over the initial capacity of the
+        group. In each wave:
+
+        * If `batch_size` is greater than `max_surge`, the difference of old
+        instances is terminated first.
+        * Then, desired capacity is increased to launch `batch_size` new
+        instances, and the rest of the old instances of the wave are retired
+        as new ones are ready in the balancer, see `swap_instances`.
+
+        :param batch_size: Amount of instances replaced in each wave
+        :param max_surge: Maximum amount of instances over the initial capacity
+        """
+        if batch_size < 1 or max_surge < 0:
+            raise EC2AutoScaleException(
+                "Invalid rolling deployment: batch_size must be positive and "
+                "max_surge can't be negative"
+            )
+
+        start = time.time()
+        instances_ids = self.get_instances_with_status('running')
+        self.group = self._get_autoscaling_group()
+        capacity = self.group.desired_capacity
+
+        for wave_start in range(0, len(instances_ids), batch_size):
+            wave = instances_ids[wave_start:wave_start + batch_size]
+            surge = min(len(wave), max_surge)
+            print "Replacing instances %d to %d of %d" % (
+                wave_start + 1,
+                wave_start + len(wave),
+                len(instances_ids)
+            )
+
+            # Terminated instances may still be running when the capacity is
+            # increased, so the whole wave is expected to be replaced
+            unavailable, surged = wave[:len(wave) - surge], wave[len(wave) - surge:]
+            if unavailable:
+                self.terminate_instances(unavailable, restore_max_size=False)
+            self.increase_desired_capacity(capacity + surge)
+            self.swap_instances(surged, expected_instances=len(wave))
+
+        self.restore_max_size()
+        self.print_throughput(len(instances_ids), time.time() - start)
+
+    def print_throughput(self, instances, seconds_elapsed):
+        """
+        Prints and stores in `throughput` the amount of `instances` replaced
+        per minute
+        """
+        self.throughput = instances * 60.0 / max(seconds_elapsed, 1)
+        minutes, seconds = divmod(int(seconds_elapsed), 60)
+        print "Replaced %d instances in %02d:%02d (%.1f instances per minute)" % (
+            instances,
+            minutes,
+            seconds,
+            self.throughput
+        )
 
     def update_or_create(self):
         """
@@ -643,31 +1172,50 @@ class EC2AutoScaleGroup(EC2AutoScale):
             self.group.update()
             self.group = self._get_autoscaling_group()
 
-    def status(self):
+    def status(self, max_activities=None):
         """
         Returns the group status in a dictionary.
+
+        The status is built from a single description of the group, a single
+        health request per balancer and a single activities request, so it
+        is a consistent view of the group at a point in time. Health and
+        activities are requested at the same time.
+
+        :param max_activities: Maximum amount of activities in the status. By
+                               default, `MAX_ACTIVITIES`.
         """
-        self.group = self._get_autoscaling_group()
+        self.group = group = self._get_autoscaling_group()
+        balancers = self.load_balancers(group) or []
         status = {
-            'Name': self.group.name,
-            'Launch configuration': self.group.launch_config_name,
+            'Name': group.name,
+            'Launch configuration': group.launch_config_name,
             'Instances': [],
             'Activities': [],
             'Balancers': 'N/A',
-            'Instances': [],
         }
 
-        if self.load_balancers():
-            balancer_names = map(lambda e: e.name, self.load_balancers())
-            status['Balancers'] = ", ".join(balancer_names)
+        if balancers:
+            status['Balancers'] = ", ".join([balancer.name for balancer in balancers])
 
-        for instance in self.group.instances:
+        instances_ids = [instance.instance_id for instance in group.instances]
+        activities = self.submit(
+            self.get_activities,
+            self.MAX_ACTIVITIES if max_activities is None else max_activities
+        )
+        instances_health = dict(zip(
+            [balancer.name for balancer in balancers],
+            gather([
+                balancer.submit(balancer.get_instances_health, instances_ids)
+                for balancer in balancers
+            ])
+        ))
+
+        for instance in group.instances:
             elb_status = {}
-            if self.load_balancers():
-                for balancer in self.load_balancers():
-                    health = balancer.get_instance_health(instance.instance_id)
-                    elb_status['ELB %s status' % balancer.name] = getattr(health, 'state', 'Unknown')
-                    elb_status['ELB %s reason' % balancer.name] = getattr(health, 'description', 'Unknown')
+            for balancer in balancers:
+                health = instances_health[balancer.name].get(instance.instance_id)
+                elb_status['ELB %s status' % balancer.name] = getattr(health, 'state', 'Unknown')
+                elb_status['ELB %s reason' % balancer.name] = getattr(health, 'description', 'Unknown')
 
             instance_status = {
                 'Id': instance.instance_id,
@@ -678,7 +1226,8 @@ class EC2AutoScaleGroup(EC2AutoScale):
             instance_status.update(elb_status)
 
             status['Instances'].append(instance_status)
-        for activity in self.group.get_activities():
+
+        for activity in activities.result():
             status['Activities'].append(
                 {
                     'Description': activity.description,
@@ -690,45 +1239,35 @@ class EC2AutoScaleGroup(EC2AutoScale):
 
         return status
 
-    def get_all_launch_configurations(self):
+    def get_activities(self, max_activities=None):
         """
-        Get all the launch configurations associated with the autoscaling
-        group of the application.
-
-        Please, notice that AWS provides no relation between autoscaling
-        configuration and group. What we're doing here is get all the
-        available configuration and return only the one which matches
-        a given regexp. This may cause false positives and return incorrect
-        launch configurations.
+        Get the latest `max_activities` activities of the autoscale group,
+        requesting only the pages needed. All of them by default.
         """
-        all_configurations = self.autoscale.get_all_launch_configurations()
-        configurations_for_this_group = []
-        while True:
-            # I have to do this because AWS don't let you tag launch
-            # configurations. Beware with false positives in case you have
-            # similar names
-            regex = r"^%s-\d{4}-\d{2}-\d{2}-\d+" % self.name
-            for resource in all_configurations:
-                # The configuration name starts with the group name and a dash
-                if re.findall(regex, resource.name):
-                    launch_configuration = EC2AutoScaleConfig(
-                        resource.name,
-                        self.application,
-                        resource=resource
-                    )
+        kwargs = {}
+        if max_activities:
+            # AWS returns up to 100 activities per page
+            kwargs['max_records'] = min(max_activities, 100)
 
-                    configurations_for_this_group.append(launch_configuration)
+        activities = paginate(self.autoscale.get_all_activities, self.name, **kwargs)
+        return list(itertools.islice(activities, max_activities))
 
-            if all_configurations.next_token is None:
-                break
+    def get_all_launch_configurations(self):
+        """
+        Get all the launch configurations associated with the autoscaling
+        group of the application, sorted from the oldest to the newest.
 
-            all_configurations = self.autoscale.get_all_launch_configurations(
-                next_token=all_configurations.next_token
+        See `get_launch_configurations_index` to know how launch
+        configurations are related to the group.
+        """
+        return [
+            EC2AutoScaleConfig(
+                resource.name,
+                self.application,
+                resource=resource
             )
-
-        configurations_for_this_group.sort(cmp=lambda x, y: x.name < y.name)
-
-        return configurations_for_this_group
+            for resource in self.get_launch_configurations_index().get(self.name, [])
+        ]
 
 
 class EC2AutoScaleNotification(EC2AutoScale):
@@ -800,10 +1339,11 @@ class EC2AutoScalePolicy(EC2AutoScale):
         policy = ScalingPolicy(name=self.name, **self.configuration)
         self.autoscale.create_scaling_policy(policy)
         # Refresh policy from EC2 to get ARN
-        self.resource = self.autoscale.get_all_policies(
+        self.resource = first(
+            self.autoscale.get_all_policies,
             as_group=self.group.name,
             policy_names=[self.name]
-        )[0]
+        )
 
     def get_policy_arn(self):
         return self.resource.policy_arn
@@ -837,55 +1377,204 @@ class ELBBalancer(ELB):
     ELB balancer
     """
 
+    # `forseti.utils.Waiter` parameters used while waiting for instances health
+    HEALTH_WAIT = {
+        'interval': 1,
+        'backoff': 1.5,
+        'jitter': 0.1,
+        'max_interval': 10,
+        'timeout': 15 * 60,
+    }
+
+    # Error code returned by AWS when an instance doesn't exist
+    INVALID_INSTANCE_ERROR = 'InvalidInstance'
+
     def __init__(self, name, application, configuration=None):
         super(ELBBalancer, self).__init__(name, application, configuration)
-        self.balancer = self.elb.get_all_load_balancers(load_balancer_names=[self.name])[0]
+        self._balancer = None
+        # Seconds the instances took to be stable in the last
+        # `wait_for_instances_stable`
+        self.convergence_time = None
+
+    @classmethod
+    def get(cls, name, application):
+        """
+        Get the balancer `name` from the identity map of the current scope,
+        see `forseti.models.identity.identity_scope`
+        """
+        return get_or_create(cls, name, lambda: cls(name, application))
+
+    def refresh(self):
+        """
+        Forgets the `boto.ec2.elb.loadbalancer.LoadBalancer`, so it's
+        requested again the next time it's needed
+        """
+        self._balancer = None
+        return self
+
+    @property
+    def balancer(self):
+        """
+        `boto.ec2.elb.loadbalancer.LoadBalancer` of the balancer. It's only
+        requested the first time it's needed.
+        """
+        if self._balancer is None:
+            self._balancer = self.elb.get_all_load_balancers(load_balancer_names=[self.name])[0]
+        return self._balancer
+
+    def get_instances_health(self, instance_ids=None):
+        """
+        Get the health of the instances in the balancer using a single
+        DescribeInstanceHealth call. Returns a dictionary whose keys are
+        instance ids and values `boto.ec2.elb.instancestate.InstanceState`.
+
+        Instances which aren't registered in the balancer are `OutOfService`.
+        AWS fails the whole call if any of the instances doesn't exist, so
+        those are left out of the result and the call is done again.
+
+        :param instance_ids: Limit the result to these instances. By default,
+                             all the instances registered are returned.
+        """
+        if instance_ids is not None:
+            instance_ids = list(instance_ids)
+            if not instance_ids:
+                return {}
+
+        while True:
+            try:
+                states = self.elb.describe_instance_health(self.name, instances=instance_ids)
+                break
+            except BotoServerError as exception:
+                missing_ids = self._get_invalid_instance_ids(exception, instance_ids)
+                if not missing_ids:
+                    raise
+                instance_ids = [
+                    instance_id
+                    for instance_id in instance_ids
+                    if instance_id not in missing_ids
+                ]
+                if not instance_ids:
+                    return {}
+
+        return dict((state.instance_id, state) for state in states)
+
+    @classmethod
+    def _get_invalid_instance_ids(cls, exception, instance_ids):
+        """
+        Get the instances among `instance_ids` which AWS reported as non
+        existent in `exception`
+        """
+        if instance_ids is None or exception.error_code != cls.INVALID_INSTANCE_ERROR:
+            return set()
+
+        message = exception.message or exception.body or ''
+        return set(instance_id for instance_id in instance_ids if instance_id in message)
 
     def get_instance_health(self, instance_id):
         """
-        Get number of instances running
+        Get the health of an instance in the balancer or `None` if it's not
+        registered
         """
-        try:
-            instance_health = self.balancer.get_instance_health([instance_id])[0]
-            return instance_health
-        except:
-            pass
-        return None
+        return self.get_instances_health([instance_id]).get(instance_id)
 
     def filter_instances_with_health(self, instance_ids, health='InService'):
         """
-        Get number of instances running
+        Get the instances among `instance_ids` whose health is `health`
         """
-        instances = []
-        for instance in instance_ids:
-            try:
-                instance_health = self.balancer.get_instance_health([instance])[0]
-            except:
-                continue
-            if instance_health.state == health:
-                instances.append(instance)
-        return instances
+        instances_health = self.get_instances_health(instance_ids)
+        return [
+            instance_id
+            for instance_id in instance_ids
+            if instance_id in instances_health and
+            instances_health[instance_id].state == health
+        ]
+
+    def wait_for_instances_with_health(
+        self, instances_ids, health='InService', cancel_event=None, show_progress=True
+    ):
+        """
+        Wait until all the instances have `health` in the balancer
+
+        :param cancel_event: `threading.Event` which cancels the wait when set
+        :param show_progress: Show a balloon while waiting
+        """
+        Waiter(**self.HEALTH_WAIT).wait(
+            lambda: len(self.filter_instances_with_health(instances_ids, health=health)) == len(instances_ids),
+            "Waiting for %d instances until they're in the balancer %s with status %s" % (
+                len(instances_ids),
+                self.name,
+                health
+            ),
+            cancel_event=cancel_event,
+            show_progress=show_progress
+        )
+
+    def wait_for_instances_stable(
+        self, instances_ids, health='InService', observations=3, window=None,
+        cancel_event=None, show_progress=True, on_stable=None
+    ):
+        """
+        Wait until every instance has had `health` in the balancer during
+        `observations` consecutive polls done within `window` seconds. The
+        seconds it took for all of them are stored in `convergence_time` and
+        returned.
+
+        :param cancel_event: `threading.Event` which cancels the wait when set
+        :param show_progress: Show a balloon while waiting
+        :param on_stable: Function called with the id of each instance as
+                          soon as it's stable
+        """
+        parameters = dict(self.HEALTH_WAIT)
+        if window:
+            # Poll often enough to fit all the observations in the window
+            parameters['max_interval'] = min(
+                parameters['max_interval'],
+                float(window) / observations
+            )
+            parameters['interval'] = min(parameters['interval'], parameters['max_interval'])
+
+        instances_ids = list(instances_ids)
+        detectors = dict(
+            (instance_id, StabilityDetector(observations, window))
+            for instance_id in instances_ids
+        )
+        stable_instances = set()
+
+        def instances_stable():
+            healthy_instances = set(self.filter_instances_with_health(instances_ids, health=health))
+            for instance_id in instances_ids:
+                if instance_id in stable_instances:
+                    continue
+                if detectors[instance_id].observe(instance_id in healthy_instances):
+                    stable_instances.add(instance_id)
+                    if on_stable:
+                        on_stable(instance_id)
+            return len(stable_instances) == len(instances_ids)
+
+        Waiter(**parameters).wait(
+            instances_stable,
+            "Waiting for %d instances until they're stable in the balancer %s with status %s" % (
+                len(instances_ids),
+                self.name,
+                health
+            ),
+            cancel_event=cancel_event,
+            show_progress=show_progress
+        )
+        self.convergence_time = max(
+            [detector.convergence_time for detector in detectors.values()] or [0]
+        )
 
-    def wait_for_instances_with_health(self, instances_ids, health='InService'):
-        with balloon_timer("Waiting for %d instances until they're in the balancer %s with status %s" % (
-            len(instances_ids),
-            self.balancer.name,
-            health
-        )) as balloon:
-            i = 0
-            while len(self.filter_instances_with_health(instances_ids, health=health)) != len(instances_ids):
-                balloon.update(i)
-                i += 1
-                time.sleep(1)
+        return self.convergence_time
 
     def get_health_check_interval(self):
         return self.balancer.health_check.interval
 
     def deregister_instances(self, instances):
-        return self.balancer.deregister_instances(instances)
+        return self.elb.deregister_instances(self.name, instances)
 
     def register_instances(self, instances):
-        return self.balancer.register_instances(instances)
+        return self.elb.register_instances(self.name, instances)
 
 
 class SNSMessageSender(SNS):
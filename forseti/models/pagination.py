@@ -0,0 +1,55 @@
+"""
+Pagination of boto list calls
+"""
+
+
+def paginate(method, *args, **kwargs):
+    """
+    Generator which yields the items returned by a boto list `method` page
+    by page. A new page is only requested when the caller consumes all the
+    items of the previous one, so it stops as soon as the caller stops
+    iterating.
+
+    ```
+    for group in paginate(connection.get_all_groups):
+        ...
+    ```
+
+    Most of the AWS list calls return a `NextToken` element and accept a
+    `next_token` argument, which is the default behaviour. Other ones, like
+    the ELB calls, use markers instead:
+
+    ```
+    paginate(
+        connection.get_all_load_balancers,
+        token_argument='marker',
+        token_attribute='next_marker'
+    )
+    ```
+
+    :param method: boto method returning a `boto.resultset.ResultSet`
+    :param token_argument: Argument of `method` receiving the pagination token
+    :param token_attribute: Attribute of the result set holding the token
+                            of the next page
+    Any other argument is passed to `method`.
+    """
+    token_argument = kwargs.pop('token_argument', 'next_token')
+    token_attribute = kwargs.pop('token_attribute', 'next_token')
+
+    while True:
+        page = method(*args, **kwargs)
+        for item in page:
+            yield item
+
+        token = getattr(page, token_attribute, None)
+        if not token:
+            return
+        kwargs[token_argument] = token
+
+
+def first(method, *args, **kwargs):
+    """
+    Returns the first item of a paginated boto list `method` or `None` if
+    there's none. See `paginate`.
+    """
+    return next(paginate(method, *args, **kwargs), None)
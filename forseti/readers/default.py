@@ -1,7 +1,10 @@
 import time
 from blessings import Terminal
 from forseti.exceptions import ForsetiException
-from forseti.models import EC2AutoScaleGroup
+from forseti.models import (
+    EC2AMI,
+    EC2AutoScaleGroup,
+)
 from forseti.utils import (
     DefaultFormatter,
     JsonFormatter,
@@ -90,9 +93,7 @@ class DefaultReader(object):
         Updates the autoscale group status and limit the activities to
         `max_activities`
         """
-        status = group.status()
-        status['Activities'] = status['Activities'][:max_activities]
-        return status
+        return group.status(max_activities)
 
     def _print_status(self, group, max_activities, color=True):
         """
@@ -112,7 +113,7 @@ class DefaultReader(object):
         """
         # activities can be read from args and must be converted.
         max_activities = int(activities) if activities else 3
-        group = EC2AutoScaleGroup(
+        group = EC2AutoScaleGroup.get(
             self.configuration.get_autoscale_group(application),
             application,
             self.configuration.get_autoscale_group_configuration(application)
@@ -140,14 +141,38 @@ class DefaultReader(object):
         List all the launch configurations of the autoscaling group belonging
         to the application
         """
-        group = EC2AutoScaleGroup(
-            self.configuration.get_autoscale_group(application),
-            application,
-            self.configuration.get_autoscale_group_configuration(application)
+        self.list_applications_autoscale_configurations([application])
+
+    def list_applications_autoscale_configurations(self, applications):
+        """
+        List all the launch configurations of the autoscaling groups belonging
+        to the applications. The AMIs and snapshots of all of them are
+        requested at once.
+        """
+        configurations = {}
+        for application in applications:
+            group = EC2AutoScaleGroup.get(
+                self.configuration.get_autoscale_group(application),
+                application,
+                self.configuration.get_autoscale_group_configuration(application)
+            )
+            configurations[application] = group.get_all_launch_configurations()
+
+        amis = EC2AMI.load_many(
+            None,
+            [
+                configuration.resource.image_id
+                for application in applications
+                for configuration in configurations[application]
+            ]
         )
-        configurations = group.get_all_launch_configurations()
-        for configuration in configurations:
-            ami = configuration.ami()
-            print "- %s " % configuration.name
-            print "\t- AMI: %s " % (ami.ami_id if ami.ami_id else "Unknown")
-            print "\t- Snapshot: %s " % (ami.snapshot_id if ami.snapshot_id else "Unknown")
+
+        for application in applications:
+            print "\nApplication: %s" % application
+            print "============="
+            for configuration in configurations[application]:
+                ami = amis[configuration.resource.image_id]
+                snapshot = ami.snapshot
+                print "- %s " % configuration.name
+                print "\t- AMI: %s " % (ami.ami_id if ami.resource else "Unknown")
+                print "\t- Snapshot: %s " % (snapshot.id if snapshot else "Unknown")
@@ -0,0 +1,197 @@
+"""
+Commands run over SSH in several hosts at once
+"""
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+import paramiko
+
+from forseti.utils import thread_prefixed_stdout
+
+
+class SSHConnectionPool(object):
+    """
+    Authenticated `paramiko.SSHClient` connections, one per host, opened the
+    first time a host is used and reused afterwards. Several commands can run
+    at the same time over the same connection, each one in its own channel.
+    """
+
+    def __init__(self, username, key_filename=None, port=22, timeout=10):
+        self.username = username
+        self.key_filename = key_filename
+        self.port = port
+        self.timeout = timeout
+        self._clients = {}
+        self._host_locks = {}
+        self._lock = threading.Lock()
+
+    def _host_lock(self, host):
+        with self._lock:
+            return self._host_locks.setdefault(host, threading.Lock())
+
+    def add(self, host, client):
+        """
+        Adds an already opened `client` to `host`, so it's reused
+        """
+        with self._lock:
+            self._clients[host] = client
+
+    def get(self, host):
+        """
+        Get an active connection to `host`, opening it if needed
+        """
+        with self._host_lock(host):
+            client = self._clients.get(host)
+            if client and client.get_transport() and client.get_transport().is_active():
+                return client
+
+            client = paramiko.SSHClient()
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            try:
+                client.connect(
+                    host,
+                    port=self.port,
+                    username=self.username,
+                    key_filename=self.key_filename,
+                    timeout=self.timeout
+                )
+            except Exception:
+                client.close()
+                raise
+            self.add(host, client)
+
+            return client
+
+    def close(self):
+        """
+        Closes all the connections
+        """
+        with self._lock:
+            clients, self._clients = self._clients, {}
+
+        for client in clients.values():
+            client.close()
+
+
+class SSHResult(object):
+    """
+    Result of running a list of commands in a host
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.exit_code = None
+        self.failed_command = None
+        self.exception = None
+        # Seconds spent getting a connection to the host
+        self.connect_time = 0
+        # Seconds spent connecting and running all the commands
+        self.seconds_elapsed = 0
+
+    @property
+    def succeeded(self):
+        return self.exception is None and self.exit_code == 0
+
+
+class ParallelSSHExecutor(object):
+    """
+    Runs a list of commands over SSH in several hosts at once using a pool of
+    `max_workers` threads. Commands run in order in each host, stopping at the
+    first one which fails, and their output is printed prefixed with the
+    host name.
+
+    ```
+    executor = ParallelSSHExecutor(SSHConnectionPool('ubuntu', 'key.pem'))
+    executor.run(hosts, ['sudo service backend restart'])
+    executor.print_summary()
+    ```
+    """
+
+    def __init__(self, pool, max_workers=10):
+        """
+        :param pool: `SSHConnectionPool` used to connect to the hosts
+        :param max_workers: Maximum amount of hosts running commands at once
+        """
+        self.pool = pool
+        self.max_workers = max_workers
+        self.results = []
+        self.seconds_elapsed = 0
+
+    def run_command(self, client, command):
+        """
+        Runs `command` using `client`, printing its output, and returns its
+        exit code
+        """
+        _, stdout, _ = client.exec_command(command, get_pty=True)
+        for line in stdout:
+            print line.rstrip()
+
+        return stdout.channel.recv_exit_status()
+
+    def _run_host(self, host, commands, prefix=''):
+        """
+        Runs `commands` in `host` and returns a `SSHResult`
+        """
+        sys.stdout.set_prefix("%s[%s] " % (prefix, host))
+        result = SSHResult(host)
+        start = time.time()
+        try:
+            client = self.pool.get(host)
+            result.connect_time = time.time() - start
+            result.exit_code = 0
+            for command in commands:
+                result.exit_code = self.run_command(client, command)
+                if result.exit_code != 0:
+                    result.failed_command = command
+                    print "Command `%s` returned %s" % (command, result.exit_code)
+                    break
+        except Exception as exception:
+            print "Error running commands: %s" % exception
+            result.exception = exception
+        result.seconds_elapsed = time.time() - start
+
+        return result
+
+    def run(self, hosts, commands):
+        """
+        Runs `commands` in all the `hosts` and returns a list of `SSHResult`,
+        in the same order as the hosts
+        """
+        start = time.time()
+        with thread_prefixed_stdout() as prefix:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self._run_host, host, commands, prefix)
+                    for host in hosts
+                ]
+            self.results = [future.result() for future in futures]
+        self.seconds_elapsed = time.time() - start
+
+        return self.results
+
+    @property
+    def failed_results(self):
+        return [result for result in self.results if not result.succeeded]
+
+    def print_summary(self):
+        """
+        Prints the exit code, connection time and total time of each host
+        """
+        for result in self.results:
+            if result.exception:
+                status = "ERROR (%s)" % result.exception
+            elif result.succeeded:
+                status = "OK"
+            else:
+                status = "FAILED with exit code %s" % result.exit_code
+            print "%s: %s, connected in %.2fs, finished in %.2fs" % (
+                result.host,
+                status,
+                result.connect_time,
+                result.seconds_elapsed
+            )
+
+        minutes, seconds = divmod(int(self.seconds_elapsed), 60)
+        print "Total SSH execution time: %02d:%02d" % (minutes, seconds)
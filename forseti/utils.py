@@ -1,16 +1,40 @@
+import collections
 from contextlib import contextmanager
 import json
 from pprint import pformat
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    FIRST_EXCEPTION,
+    ThreadPoolExecutor,
+    wait as wait_futures,
+)
 import progressbar
 
+from forseti.exceptions import (
+    ForsetiCancelledException,
+    ForsetiException,
+    ForsetiTimeoutException,
+)
+
 
 class Balloon(progressbar.ProgressBar):
-    def __init__(self, message="Waiting", **kwargs):
+    def __init__(self, message="Waiting", show_polls=False, **kwargs):
         widgets = [
             "%s " % message,
             progressbar.AnimatedMarker(markers='.oO@* '),
             progressbar.Timer(format=" %s")
         ]
+        if show_polls:
+            widgets.append(progressbar.FormatLabel(" (%(value)d polls)"))
+        # progressbar binds `sys.stderr` when it's imported, so it wouldn't
+        # notice if it's replaced later, for instance by `ThreadPrefixedStream`
+        kwargs.setdefault('fd', sys.stderr)
         super(Balloon, self).__init__(
             maxval=progressbar.UnknownLength,
             widgets=widgets,
@@ -39,6 +63,531 @@ def balloon_timer(message, **kwargs):
     balloon.finish()
 
 
+class ThreadPrefixedStream(object):
+    """
+    File-like object which writes to `stream` prefixing each line with the
+    prefix set by the thread writing it, so the output of several threads
+    can be told apart. Lines are written whole, and when a line is rewritten
+    using carriage returns (like progress bars do) only its last version is
+    written.
+
+    ```
+    sys.stdout = ThreadPrefixedStream(sys.stdout)
+    sys.stdout.set_prefix("[backend] ")
+    ```
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def set_prefix(self, prefix):
+        """
+        Sets the prefix of the lines written by the current thread
+        """
+        self._local.prefix = prefix
+
+    def get_prefix(self):
+        """
+        Gets the prefix of the lines written by the current thread
+        """
+        return getattr(self._local, 'prefix', '')
+
+    @staticmethod
+    def _last_version(line):
+        """
+        Returns the last non empty version of a line rewritten using carriage
+        returns
+        """
+        versions = [version for version in line.split('\r') if version]
+        return versions[-1] if versions else ''
+
+    def write(self, data):
+        buffered = getattr(self._local, 'buffer', '') + data
+        lines = buffered.split('\n')
+        # Only the last version of the unfinished line is kept
+        unfinished = lines.pop()
+        self._local.buffer = unfinished[unfinished.rstrip('\r').rfind('\r') + 1:]
+        prefix = self.get_prefix()
+        if not lines:
+            return
+
+        with self._lock:
+            for line in lines:
+                self.stream.write("%s%s\n" % (prefix, self._last_version(line)))
+            self.stream.flush()
+
+    def flush(self):
+        with self._lock:
+            self.stream.flush()
+
+    def fileno(self):
+        return self.stream.fileno()
+
+    def isatty(self):
+        return False
+
+
+@contextmanager
+def thread_prefixed_stdout():
+    """
+    Context manager which makes sure `sys.stdout` is a `ThreadPrefixedStream`
+    while it's active, so threads started inside can set their own prefix.
+    It yields the prefix of the calling thread, which is empty unless
+    `sys.stdout` was already a `ThreadPrefixedStream`.
+
+    ```
+    with thread_prefixed_stdout() as prefix:
+        run_in_threads(prefix)
+    ```
+    """
+    stdout = sys.stdout
+    if isinstance(stdout, ThreadPrefixedStream):
+        yield stdout.get_prefix()
+        return
+
+    sys.stdout = ThreadPrefixedStream(stdout)
+    try:
+        yield ''
+    finally:
+        sys.stdout = stdout
+
+
+def run_command(command, working_directory=None):
+    """
+    Runs a shell `command` in `working_directory`. Unlike `os.chdir`, the
+    working directory only affects the command, so it is safe to run commands
+    from several threads.
+
+    When `sys.stdout` is a `ThreadPrefixedStream`, because several commands
+    run at once, the output is printed line by line so it's prefixed.
+    Otherwise the command keeps the terminal, so it can prompt and use colors.
+
+    Returns the command exit code.
+    """
+    if not isinstance(sys.stdout, ThreadPrefixedStream):
+        sys.stdout.flush()
+        return subprocess.call(command, shell=True, cwd=working_directory)
+
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        cwd=working_directory,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT
+    )
+    for line in iter(process.stdout.readline, ''):
+        sys.stdout.write(line)
+    process.stdout.close()
+
+    return process.wait()
+
+
+class Waiter(object):
+    """
+    Polls a predicate until it returns a value evaluated as `True`, showing
+    a balloon with the elapsed time and the amount of polls done.
+
+    The time between polls starts at `interval` seconds and it's multiplied
+    by `backoff` after each poll up to `max_interval`. A random `jitter`
+    fraction of the interval is added to avoid polling in lockstep. If the
+    predicate isn't satisfied in `timeout` seconds, a
+    `ForsetiTimeoutException` is raised.
+
+    Waiting between polls is done by `sleep`, which receives the amount of
+    seconds to wait. A function returning earlier, for instance when an
+    event arrives, makes the waiter poll again immediately.
+
+    If a `cancel_event` is given to `wait`, a `ForsetiCancelledException` is
+    raised as soon as the event is set. This is useful to stop other waits
+    running concurrently when one of them fails, see `run_concurrently`.
+
+    ```
+    waiter = Waiter(interval=5, backoff=1.5, max_interval=30, timeout=3600)
+    image = waiter.wait(image_is_available, "Creating image")
+    print "Image created after %d polls" % waiter.polls
+    ```
+    """
+
+    def __init__(
+        self, interval=1, backoff=1, jitter=0, max_interval=None, timeout=None,
+        sleep=time.sleep
+    ):
+        self.interval = interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.sleep = sleep
+        self.polls = 0
+        self.elapsed = 0
+
+    def _next_interval(self, interval):
+        """
+        Returns the interval to be used after `interval`
+        """
+        interval = interval * self.backoff
+        if self.max_interval is not None:
+            interval = min(interval, self.max_interval)
+        return interval
+
+    def wait(self, predicate, message="Waiting", cancel_event=None, show_progress=True):
+        """
+        Calls `predicate` until it returns a value evaluated as `True` and
+        returns that value.
+
+        :param predicate: Function without arguments
+        :param message: Message shown in the balloon
+        :param cancel_event: `threading.Event` which cancels the wait when set
+        :param show_progress: Show a balloon while waiting. Disable it when
+                              the progress is shown by someone else.
+        """
+        if not show_progress:
+            return self._wait(predicate, message, cancel_event, None)
+
+        with balloon_timer(message, show_polls=True) as balloon:
+            return self._wait(predicate, message, cancel_event, balloon)
+
+    def _wait(self, predicate, message, cancel_event, balloon):
+        self.polls = 0
+        start = time.time()
+        interval = self.interval
+        sleep = self.sleep
+        if cancel_event is not None and sleep is time.sleep:
+            # Wake up as soon as the wait is cancelled
+            sleep = cancel_event.wait
+
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ForsetiCancelledException("%s: cancelled" % message)
+
+            result = predicate()
+            self.polls += 1
+            self.elapsed = time.time() - start
+            if balloon is not None:
+                balloon.update(self.polls)
+            if result:
+                return result
+
+            if self.timeout is not None and self.elapsed >= self.timeout:
+                raise ForsetiTimeoutException(
+                    "%s: timed out after %d seconds and %d polls" %
+                    (message, self.elapsed, self.polls)
+                )
+
+            sleep_time = interval + random.uniform(0, self.jitter * interval)
+            if self.timeout is not None:
+                sleep_time = min(sleep_time, self.timeout - self.elapsed)
+            sleep(sleep_time)
+            interval = self._next_interval(interval)
+
+
+class StabilityDetector(object):
+    """
+    Tells whether a condition is stable: it has been observed `observations`
+    times in a row and, if a `window` in seconds is given, all of those
+    observations happened within it. It also records how long it took since
+    the first observation until the condition became stable.
+
+    ```
+    detector = StabilityDetector(observations=3, window=60)
+    waiter.wait(lambda: detector.observe(instances_are_healthy()))
+    print "Stable after %d seconds" % detector.convergence_time
+    ```
+    """
+
+    def __init__(self, observations=3, window=None):
+        self.observations = observations
+        self.window = window
+        self.streak = collections.deque(maxlen=observations)
+        self.first_observation = None
+        self.convergence_time = None
+
+    def observe(self, value):
+        """
+        Records a new observation of the condition and returns `True` if
+        the condition is stable
+        """
+        now = time.time()
+        if self.first_observation is None:
+            self.first_observation = now
+
+        if not value:
+            self.streak.clear()
+            return False
+
+        self.streak.append(now)
+        stable = (
+            len(self.streak) == self.observations and
+            (self.window is None or now - self.streak[0] <= self.window)
+        )
+        if stable and self.convergence_time is None:
+            self.convergence_time = now - self.first_observation
+
+        return stable
+
+
+class RateLimiter(object):
+    """
+    Token bucket limiting the amount of operations done per second by any
+    number of threads. Up to `burst` operations can be done at once, and
+    tokens are refilled at `rate` per second.
+
+    ```
+    limiter = RateLimiter(rate=5)
+    limiter.acquire()
+    connection.delete_snapshot(snapshot_id)
+    ```
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.last_refill = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until an operation can be done
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                self.tokens = min(
+                    self.burst,
+                    self.tokens + (now - self.last_refill) * self.rate
+                )
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Threads of `run_concurrently`, created the first time it's called and kept
+# afterwards, so they reuse their AWS connections between calls
+CONCURRENT_POOL_SIZE = 32
+_concurrent_pool = None
+_concurrent_pool_lock = threading.Lock()
+
+
+def get_concurrent_pool():
+    """
+    Get the long-lived `ThreadPoolExecutor` used by `run_concurrently`
+    """
+    global _concurrent_pool
+    with _concurrent_pool_lock:
+        if _concurrent_pool is None:
+            _concurrent_pool = ThreadPoolExecutor(max_workers=CONCURRENT_POOL_SIZE)
+        return _concurrent_pool
+
+
+def run_concurrently(functions, message, max_workers=4):
+    """
+    Runs `functions` concurrently, `max_workers` at most at once, showing a
+    single balloon with `message` until all of them finish. Each function
+    receives a `cancel_event` keyword argument, a `threading.Event` which is
+    set when any of the functions fails, so the rest can stop early and no
+    more are started. The first exception raised is raised again once the
+    running functions finish. Functions run in the identity scope of the
+    calling thread, see `forseti.models.identity.identity_scope`, using the
+    threads of `get_concurrent_pool`.
+
+    Returns the values returned by `functions`, in the same order.
+    """
+    # Imported here, as `forseti.models` depends on this module
+    from forseti.models.identity import bind_identity_scope
+
+    functions = [bind_identity_scope(function) for function in functions]
+    pool = get_concurrent_pool()
+    cancel_event = threading.Event()
+    futures = []
+    pending = set()
+    with balloon_timer(message) as balloon:
+        i = 0
+        while True:
+            while (
+                len(futures) < len(functions) and
+                len(pending) < max_workers and
+                not cancel_event.is_set()
+            ):
+                future = pool.submit(functions[len(futures)], cancel_event=cancel_event)
+                futures.append(future)
+                pending.add(future)
+            if not pending:
+                break
+
+            done, pending = wait_futures(
+                pending,
+                timeout=1,
+                return_when=FIRST_EXCEPTION
+            )
+            if any(future.exception() for future in done):
+                cancel_event.set()
+            balloon.update(i)
+            i += 1
+
+    # The exception which caused the cancellation goes first
+    for future in futures:
+        exception = future.exception()
+        if exception and not isinstance(exception, ForsetiCancelledException):
+            raise exception
+
+    return [future.result() for future in futures]
+
+
+class TaskGraph(object):
+    """
+    Runs a set of functions with dependencies between them, starting each
+    one as soon as all the functions it depends on have finished. Functions
+    without pending dependencies run concurrently in a pool of threads.
+
+    ```
+    graph = TaskGraph()
+    graph.add('group', create_group)
+    graph.add('policy', create_policy, depends_on=['group'])
+    graph.add('alarm', create_alarm, depends_on=['policy'])
+    results = graph.run()
+    ```
+
+    Each function receives the results of its dependencies as positional
+    arguments, in the same order as `depends_on`, and runs in the identity
+    scope of the thread calling `run`, see
+    `forseti.models.identity.identity_scope`.
+    """
+
+    def __init__(self):
+        self.tasks = collections.OrderedDict()
+        self.timings = collections.OrderedDict()
+
+    def add(self, name, function, depends_on=None):
+        """
+        Adds a task called `name` running `function` after all the tasks in
+        `depends_on` have finished
+        """
+        if name in self.tasks:
+            raise ForsetiException("Task %s already exists" % name)
+        depends_on = list(depends_on or [])
+        for dependency in depends_on:
+            if dependency not in self.tasks:
+                raise ForsetiException(
+                    "Task %s depends on unknown task %s" % (name, dependency)
+                )
+        self.tasks[name] = (function, depends_on)
+
+    def _run_task(self, name, arguments, prefix=''):
+        sys.stdout.set_prefix(prefix)
+        start = time.time()
+        try:
+            return self.tasks[name][0](*arguments)
+        finally:
+            self.timings[name] = time.time() - start
+
+    def run(self, max_workers=8):
+        """
+        Runs all the tasks and returns a dictionary with the result of each
+        one. When a task fails no more tasks are started, and its exception
+        is raised once the running ones finish.
+        """
+        # Imported here, as `forseti.models` depends on this module
+        from forseti.models.identity import bind_identity_scope
+
+        run_task = bind_identity_scope(self._run_task)
+        results = {}
+        pending = collections.OrderedDict(self.tasks)
+        running = {}
+        failed = None
+        # Keep the prefix of the calling thread, for instance when several
+        # applications are deployed at once
+        with thread_prefixed_stdout() as prefix:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while (pending and failed is None) or running:
+                    if failed is None:
+                        for name, (_, depends_on) in pending.items():
+                            if all(dependency in results for dependency in depends_on):
+                                arguments = [results[dependency] for dependency in depends_on]
+                                running[executor.submit(run_task, name, arguments, prefix)] = name
+                                del pending[name]
+
+                    done, _ = wait_futures(running.keys(), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        if future.exception() is not None:
+                            failed = failed or future
+                        else:
+                            results[name] = future.result()
+
+        if failed is not None:
+            failed.result()
+
+        return results
+
+    def print_timings(self):
+        """
+        Prints how long each task took, in the order they were added
+        """
+        for name in self.tasks:
+            if name in self.timings:
+                print "%s: %.2fs" % (name, self.timings[name])
+
+
+class VersionedNameAllocator(object):
+    """
+    Allocates names in the form `<prefix>-<version>`, where version is the
+    next one to the highest version found in `existing_names`. Names not
+    starting with `prefix` are ignored.
+
+    ```
+    allocator = VersionedNameAllocator("backend-2015-05-01", existing_names)
+    name, result = allocator.allocate(create, is_name_taken)
+    ```
+    """
+
+    def __init__(self, prefix, existing_names=None):
+        self.prefix = prefix
+        regex = re.compile(r"^%s-(\d+)$" % re.escape(prefix))
+        self.version = 0
+        for name in existing_names or []:
+            match = regex.match(name)
+            if match:
+                self.version = max(self.version, int(match.group(1)))
+
+    def next_name(self):
+        """
+        Returns the next free name
+        """
+        self.version += 1
+        return "%s-%s" % (self.prefix, self.version)
+
+    def allocate(self, create, is_name_taken, attempts=10):
+        """
+        Calls `create` with the next free name and returns a tuple with the
+        name and the value returned by `create`. If the name was taken by
+        someone else in the meantime, the following version is tried.
+
+        :param create: Function receiving a name which creates the resource
+        :param is_name_taken: Function receiving the exception raised by
+                              `create` which must return `True` if it was
+                              raised because the name is already in use.
+        :param attempts: Maximum amount of names to try
+        """
+        for _ in range(attempts):
+            name = self.next_name()
+            try:
+                return name, create(name)
+            except Exception as exception:
+                if not is_name_taken(exception):
+                    raise
+
+        raise ForsetiException(
+            "Could not find a free name for %s after %d attempts" %
+            (self.prefix, attempts)
+        )
+
+
 class DefaultFormatter():
     """
     Class to display a variable beautifully
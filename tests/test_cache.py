@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import Mock
+
+from forseti.models.cache import DescribeCache
+
+
+class DescribeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = DescribeCache(self.directory)
+        self.connection = Mock(aws_access_key_id='key')
+        self.make_request = self.connection.make_request
+        self.make_request.return_value = Mock(status=200, reason='OK', read=lambda: '<xml/>')
+        self.cache.install(self.connection, 'ec2', 'eu-west-1')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_describe_calls_are_cached(self):
+        first = self.connection.make_request('DescribeInstances', {'InstanceId.1': 'i-1'})
+        second = self.connection.make_request('DescribeInstances', {'InstanceId.1': 'i-1'})
+
+        self.assertEqual(first.read(), '<xml/>')
+        self.assertEqual(second.read(), '<xml/>')
+        self.assertEqual(self.make_request.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_calls_with_other_parameters_are_not_shared(self):
+        self.connection.make_request('DescribeInstances', {'InstanceId.1': 'i-1'})
+        self.connection.make_request('DescribeInstances', {'InstanceId.1': 'i-2'})
+
+        self.assertEqual(self.make_request.call_count, 2)
+
+    def test_expired_responses_are_requested_again(self):
+        self.cache.ttls['DescribeInstances'] = -1
+
+        self.connection.make_request('DescribeInstances')
+        self.connection.make_request('DescribeInstances')
+
+        self.assertEqual(self.make_request.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        self.make_request.return_value = Mock(status=400, reason='Bad Request', read=lambda: '<error/>')
+
+        self.connection.make_request('DescribeInstances')
+        self.connection.make_request('DescribeInstances')
+
+        self.assertEqual(self.make_request.call_count, 2)
+
+    def test_changes_clear_the_cache(self):
+        self.connection.make_request('DescribeInstances')
+        self.connection.make_request('TerminateInstances', {'InstanceId.1': 'i-1'})
+        self.connection.make_request('DescribeInstances')
+
+        self.assertEqual(self.make_request.call_count, 3)
+
+    def test_calls_to_other_services_keep_the_cache(self):
+        sqs = self.cache.install(Mock(aws_access_key_id='key'), 'sqs', 'eu-west-1')
+
+        self.connection.make_request('DescribeInstances')
+        sqs.make_request('DeleteMessage', {'ReceiptHandle': 'handle'})
+        self.connection.make_request('DescribeInstances')
+
+        self.assertEqual(self.make_request.call_count, 1)
+
+    def test_responses_are_not_read_unless_enabled(self):
+        self.cache.read_responses = False
+        self.connection.make_request('DescribeInstances')
+        self.connection.make_request('DescribeInstances')
+
+        self.assertEqual(self.make_request.call_count, 2)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_oldest_entries_are_evicted(self):
+        self.cache.max_size = 1
+        self.connection.make_request('DescribeInstances')
+
+        self.assertEqual(os.listdir(self.directory), [])
@@ -0,0 +1,82 @@
+import unittest
+
+from boto.exception import BotoServerError
+from mock import Mock, patch
+
+from forseti.deployers.cleanup import LaunchConfigurationsCleaner
+from forseti.exceptions import ForsetiException
+
+
+def launch_configuration(name, image_id):
+    configuration = Mock(resource=Mock(image_id=image_id))
+    configuration.name = name
+    configuration.resource.name = name
+    return configuration
+
+
+def ami(ami_id, snapshot_id, volume_size):
+    return Mock(ami_id=ami_id, snapshot=Mock(id=snapshot_id, volume_size=volume_size))
+
+
+class LaunchConfigurationsCleanerTest(unittest.TestCase):
+    def setUp(self):
+        self.amis = {
+            'ami-1': ami('ami-1', 'snap-1', 8),
+            'ami-2': ami('ami-2', 'snap-2', 16),
+        }
+        self.in_use = []
+
+        autoscale_patcher = patch('forseti.deployers.cleanup.EC2AutoScale')
+        self.autoscale = autoscale_patcher.start()
+        self.addCleanup(autoscale_patcher.stop)
+        self.autoscale.get_launch_configurations.side_effect = lambda: self.in_use
+
+        ami_patcher = patch('forseti.deployers.cleanup.EC2AMI')
+        ami_patcher.start().load_many.side_effect = lambda application, ids: dict(
+            (ami_id, self.amis[ami_id]) for ami_id in ids
+        )
+        self.addCleanup(ami_patcher.stop)
+
+        self.cleaner = LaunchConfigurationsCleaner(max_workers=2, rate=1000)
+
+    def test_configurations_are_deleted_with_their_amis_and_snapshots(self):
+        configurations = [
+            launch_configuration('lc-1', 'ami-1'),
+            launch_configuration('lc-2', 'ami-1'),
+            launch_configuration('lc-3', 'ami-2'),
+        ]
+        self.in_use = [configuration.resource for configuration in configurations]
+
+        self.cleaner.cleanup(configurations)
+
+        self.assertEqual(sorted(self.cleaner.launch_configurations), ['lc-1', 'lc-2', 'lc-3'])
+        self.assertEqual(sorted(self.cleaner.amis), ['ami-1', 'ami-2'])
+        self.assertEqual(sorted(self.cleaner.snapshots), ['snap-1', 'snap-2'])
+        self.assertEqual(self.cleaner.freed_size, 24)
+        self.amis['ami-1'].ec2.deregister_image.assert_called_once_with('ami-1')
+        self.amis['ami-1'].ec2.delete_snapshot.assert_called_once_with('snap-1')
+        self.autoscale.invalidate_launch_configurations_index.assert_called_once_with()
+        self.cleaner.raise_for_errors()
+
+    def test_amis_used_by_other_configurations_are_kept(self):
+        configuration = launch_configuration('lc-1', 'ami-1')
+        self.in_use = [configuration.resource, launch_configuration('lc-other', 'ami-1').resource]
+
+        self.cleaner.cleanup([configuration])
+
+        self.assertEqual(self.cleaner.launch_configurations, ['lc-1'])
+        self.assertEqual(self.cleaner.amis, [])
+        self.assertFalse(self.amis['ami-1'].ec2.deregister_image.called)
+
+    def test_ami_is_kept_if_a_configuration_could_not_be_deleted(self):
+        configuration = launch_configuration('lc-1', 'ami-1')
+        configuration.autoscale.delete_launch_configuration.side_effect = BotoServerError(400, 'In use')
+        self.in_use = [configuration.resource]
+
+        self.cleaner.cleanup([configuration])
+
+        self.assertEqual(self.cleaner.launch_configurations, [])
+        self.assertEqual(len(self.cleaner.errors), 1)
+        self.assertFalse(self.amis['ami-1'].ec2.deregister_image.called)
+        with self.assertRaises(ForsetiException):
+            self.cleaner.raise_for_errors()
@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+import unittest
+
+from mock import Mock, patch
+
+from forseti.models.events import (
+    AutoScaleEvent,
+    AutoScaleEventListener,
+    LocalEventQueue,
+    SQSEventQueue,
+)
+from forseti.models.models import EC2AutoScaleNotification
+
+
+def notification(event_type, instance_id, group_name='backend', envelope=True):
+    message = json.dumps({
+        'Event': event_type,
+        'EC2InstanceId': instance_id,
+        'AutoScalingGroupName': group_name,
+    })
+    if not envelope:
+        return message
+    return json.dumps({'Type': 'Notification', 'Message': message})
+
+
+class AutoScaleEventTest(unittest.TestCase):
+    def test_from_sns_envelope(self):
+        event = AutoScaleEvent.from_message(
+            notification(EC2AutoScaleNotification.LAUNCH, 'i-1')
+        )
+
+        self.assertEqual(event.event_type, EC2AutoScaleNotification.LAUNCH)
+        self.assertEqual(event.instance_id, 'i-1')
+        self.assertEqual(event.group_name, 'backend')
+
+    def test_from_raw_message(self):
+        event = AutoScaleEvent.from_message(
+            notification(EC2AutoScaleNotification.TERMINATE, 'i-1', envelope=False)
+        )
+
+        self.assertEqual(event.event_type, EC2AutoScaleNotification.TERMINATE)
+
+    def test_invalid_messages_are_ignored(self):
+        for body in ['not json', '[]', json.dumps({'Type': 'Notification'}), '{}']:
+            self.assertIsNone(AutoScaleEvent.from_message(body))
+
+
+class LocalEventQueueTest(unittest.TestCase):
+    def test_receive_returns_all_the_queued_messages(self):
+        queue = LocalEventQueue()
+        queue.put('first')
+        queue.put('second')
+
+        self.assertEqual(queue.receive(0), ['first', 'second'])
+        self.assertEqual(queue.receive(0), [])
+
+    def test_receive_waits_for_the_first_message(self):
+        queue = LocalEventQueue()
+        threading.Timer(0.05, queue.put, ['message']).start()
+
+        self.assertEqual(queue.receive(5), ['message'])
+
+
+class SQSEventQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.sqs_queue = Mock()
+        connection = Mock()
+        connection.get_queue.return_value = self.sqs_queue
+        with patch('forseti.models.events.get_connection', return_value=connection):
+            self.queue = SQSEventQueue('notifications')
+
+    def message(self, body):
+        return Mock(get_body=Mock(return_value=body))
+
+    def test_only_accepted_messages_are_deleted(self):
+        mine, other = self.message('mine'), self.message('other')
+        self.sqs_queue.get_messages.return_value = [mine, other]
+
+        bodies = self.queue.receive(30, accept=lambda body: body == 'mine')
+
+        self.assertEqual(bodies, ['mine'])
+        self.sqs_queue.get_messages.assert_called_once_with(num_messages=10, wait_time_seconds=20)
+        self.sqs_queue.delete_message_batch.assert_called_once_with([mine])
+
+    def test_nothing_is_deleted_without_accepted_messages(self):
+        self.sqs_queue.get_messages.return_value = [self.message('other')]
+
+        self.assertEqual(self.queue.receive(1, accept=lambda body: False), [])
+        self.assertFalse(self.sqs_queue.delete_message_batch.called)
+
+
+class AutoScaleEventListenerTest(unittest.TestCase):
+    def setUp(self):
+        self.queue = LocalEventQueue()
+        self.listener = AutoScaleEventListener(self.queue, 'backend')
+
+    def test_receive_records_launched_and_terminated_instances(self):
+        self.queue.put(notification(EC2AutoScaleNotification.LAUNCH, 'i-new'))
+        self.queue.put(notification(EC2AutoScaleNotification.TERMINATE, 'i-old'))
+        self.queue.put(notification(EC2AutoScaleNotification.LAUNCH_ERROR, 'i-error'))
+
+        events = self.listener.receive()
+
+        self.assertEqual(len(events), 3)
+        self.assertEqual(self.listener.launched, set(['i-new']))
+        self.assertEqual(self.listener.terminated, set(['i-old']))
+
+    def test_receive_ignores_other_groups_and_messages(self):
+        self.queue.put(notification(EC2AutoScaleNotification.LAUNCH, 'i-1', group_name='frontend'))
+        self.queue.put('not a notification')
+
+        self.assertEqual(self.listener.receive(), [])
+        self.assertEqual(self.listener.launched, set())
+
+    def test_wait_returns_as_soon_as_an_event_arrives(self):
+        threading.Timer(
+            0.05,
+            self.queue.put,
+            [notification(EC2AutoScaleNotification.LAUNCH, 'i-1')]
+        ).start()
+
+        start = time.time()
+        self.listener.wait(5)
+
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(self.listener.launched, set(['i-1']))
+
+    def test_wait_returns_after_the_given_seconds_without_events(self):
+        self.queue.put(notification(EC2AutoScaleNotification.LAUNCH, 'i-1', group_name='frontend'))
+
+        start = time.time()
+        self.listener.wait(0.2)
+
+        self.assertGreaterEqual(time.time() - start, 0.2)
+        self.assertEqual(self.listener.launched, set())
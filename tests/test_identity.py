@@ -0,0 +1,42 @@
+import unittest
+
+from forseti.models.executor import executor
+from forseti.models.identity import (
+    current_identity_map,
+    get_or_create,
+    identity_scope,
+)
+from forseti.utils import TaskGraph
+
+
+class Resource(object):
+    pass
+
+
+class IdentityScopeTest(unittest.TestCase):
+    def test_objects_are_created_once_per_scope(self):
+        with identity_scope():
+            resource = get_or_create(Resource, 'backend', Resource)
+            self.assertIs(get_or_create(Resource, 'backend', Resource), resource)
+            self.assertIsNot(get_or_create(Resource, 'frontend', Resource), resource)
+
+        self.assertIsNone(current_identity_map())
+        self.assertIsNot(get_or_create(Resource, 'backend', Resource), resource)
+
+    def test_nested_scopes_share_the_map(self):
+        with identity_scope() as identity_map:
+            with identity_scope() as nested_identity_map:
+                self.assertIs(nested_identity_map, identity_map)
+            self.assertIs(current_identity_map(), identity_map)
+
+    def test_worker_threads_use_the_scope_of_the_caller(self):
+        with identity_scope():
+            resource = get_or_create(Resource, 'backend', Resource)
+            graph = TaskGraph()
+            graph.add('resource', lambda: get_or_create(Resource, 'backend', Resource))
+
+            self.assertIs(graph.run()['resource'], resource)
+            self.assertIs(
+                executor.submit(get_or_create, Resource, 'backend', Resource).result(),
+                resource
+            )
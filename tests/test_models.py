@@ -0,0 +1,267 @@
+import unittest
+
+from boto.exception import BotoServerError
+from mock import Mock, PropertyMock, call, patch
+
+from forseti.exceptions import EC2AutoScaleException
+from forseti.models.models import EC2AMI, EC2AutoScaleGroup, EC2Instance, ELBBalancer
+
+
+def invalid_instance_error(*instance_ids):
+    exception = BotoServerError(400, 'Bad Request')
+    exception.error_code = ELBBalancer.INVALID_INSTANCE_ERROR
+    exception.message = 'Could not find EC2 instance %s.' % ', '.join(instance_ids)
+    return exception
+
+
+def not_found_error(error_code, *resource_ids):
+    exception = BotoServerError(400, 'Bad Request')
+    exception.error_code = error_code
+    exception.message = 'The ids %s do not exist' % ', '.join(resource_ids)
+    return exception
+
+
+def image(ami_id, snapshot_id):
+    return Mock(id=ami_id, block_device_mapping=Mock(current_value=Mock(snapshot_id=snapshot_id)))
+
+
+def reservation(*instance_ids):
+    return Mock(instances=[Mock(id=instance_id) for instance_id in instance_ids])
+
+
+class EC2InstanceLoadManyTest(unittest.TestCase):
+    def setUp(self):
+        self.ec2 = Mock()
+        patcher = patch('forseti.models.models.get_connection', return_value=self.ec2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_instances_are_requested_in_chunks(self):
+        self.ec2.get_all_instances.side_effect = [
+            [reservation('i-1', 'i-2')],
+            [reservation('i-3')],
+        ]
+
+        with patch.object(EC2Instance, 'LOAD_MANY_CHUNK_SIZE', 2):
+            instances = EC2Instance.load_many('app', ['i-1', 'i-2', 'i-3'])
+
+        self.assertEqual([instance.instance_id for instance in instances], ['i-1', 'i-2', 'i-3'])
+        self.assertEqual(self.ec2.get_all_instances.call_args_list, [
+            call(instance_ids=['i-1', 'i-2']),
+            call(instance_ids=['i-3']),
+        ])
+
+    def test_keeps_the_order_and_skips_missing_instances(self):
+        self.ec2.get_all_instances.return_value = [reservation('i-3'), reservation('i-1')]
+
+        instances = EC2Instance.load_many('app', ['i-1', 'i-2', 'i-3'])
+
+        self.assertEqual([instance.instance_id for instance in instances], ['i-1', 'i-3'])
+        self.assertEqual(self.ec2.get_all_instances.call_count, 1)
+
+    def test_no_ids_make_no_requests(self):
+        self.assertEqual(EC2Instance.load_many('app', []), [])
+        self.assertFalse(self.ec2.get_all_instances.called)
+
+
+class EC2AMILoadManyTest(unittest.TestCase):
+    def setUp(self):
+        self.ec2 = Mock()
+        patcher = patch('forseti.models.models.get_connection', return_value=self.ec2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_images_and_snapshots_are_described_by_id(self):
+        self.ec2.get_all_images.return_value = [image('ami-1', 'snap-1')]
+        self.ec2.get_all_snapshots.return_value = [Mock(id='snap-1')]
+
+        amis = EC2AMI.load_many('app', ['ami-1'])
+
+        self.assertEqual(amis['ami-1'].resource.id, 'ami-1')
+        self.assertEqual(amis['ami-1'].snapshot.id, 'snap-1')
+        self.ec2.get_all_images.assert_called_once_with(image_ids=['ami-1'])
+        self.ec2.get_all_snapshots.assert_called_once_with(snapshot_ids=['snap-1'])
+
+    def test_missing_images_and_snapshots_are_dropped_and_described_again(self):
+        self.ec2.get_all_images.side_effect = [
+            not_found_error('InvalidAMIID.NotFound', 'ami-2'),
+            [image('ami-1', 'snap-1'), image('ami-3', 'snap-3')],
+        ]
+        self.ec2.get_all_snapshots.side_effect = [
+            not_found_error('InvalidSnapshot.NotFound', 'snap-3'),
+            [Mock(id='snap-1')],
+        ]
+
+        amis = EC2AMI.load_many('app', ['ami-1', 'ami-2', 'ami-3'])
+
+        self.assertIsNone(amis['ami-2'].resource)
+        self.assertIsNone(amis['ami-2'].snapshot)
+        self.assertEqual(amis['ami-1'].snapshot.id, 'snap-1')
+        self.assertIsNone(amis['ami-3'].snapshot)
+        self.assertEqual(
+            sorted(self.ec2.get_all_images.call_args_list[1][1]['image_ids']),
+            ['ami-1', 'ami-3']
+        )
+        self.assertEqual(
+            self.ec2.get_all_snapshots.call_args_list[1][1]['snapshot_ids'],
+            ['snap-1']
+        )
+
+    def test_other_errors_are_raised(self):
+        self.ec2.get_all_images.side_effect = not_found_error('UnauthorizedOperation', 'ami-1')
+
+        with self.assertRaises(BotoServerError):
+            EC2AMI.load_many('app', ['ami-1'])
+
+
+class ELBBalancerInstancesHealthTest(unittest.TestCase):
+    def setUp(self):
+        self.elb = Mock()
+        patcher = patch('forseti.models.base.get_connection', return_value=self.elb)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.balancer = ELBBalancer('balancer', 'app')
+
+    def test_invalid_instances_are_left_out_and_the_call_retried(self):
+        self.elb.describe_instance_health.side_effect = [
+            invalid_instance_error('i-2'),
+            [Mock(instance_id='i-1'), Mock(instance_id='i-3')],
+        ]
+
+        health = self.balancer.get_instances_health(['i-1', 'i-2', 'i-3'])
+
+        self.assertEqual(sorted(health), ['i-1', 'i-3'])
+        self.assertEqual(self.elb.describe_instance_health.call_args_list, [
+            call('balancer', instances=['i-1', 'i-2', 'i-3']),
+            call('balancer', instances=['i-1', 'i-3']),
+        ])
+
+    def test_no_call_is_retried_if_all_the_instances_are_invalid(self):
+        self.elb.describe_instance_health.side_effect = invalid_instance_error('i-1')
+
+        self.assertEqual(self.balancer.get_instances_health(['i-1']), {})
+        self.assertEqual(self.elb.describe_instance_health.call_count, 1)
+
+    def test_other_errors_are_raised(self):
+        exception = BotoServerError(500, 'Internal Error')
+        exception.error_code = 'InternalFailure'
+        self.elb.describe_instance_health.side_effect = exception
+
+        with self.assertRaises(BotoServerError):
+            self.balancer.get_instances_health(['i-1'])
+
+    def test_empty_instance_ids_make_no_requests(self):
+        self.assertEqual(self.balancer.get_instances_health([]), {})
+        self.assertFalse(self.elb.describe_instance_health.called)
+
+
+class EC2AutoScaleGroupRollingTest(unittest.TestCase):
+    def setUp(self):
+        self.group = EC2AutoScaleGroup('backend', 'app')
+        self.calls = Mock()
+        self.group.get_instances_with_status = Mock(return_value=['i-1', 'i-2', 'i-3', 'i-4'])
+        self.group._get_autoscaling_group = Mock(return_value=Mock(desired_capacity=4))
+        for method in [
+            'terminate_instances',
+            'increase_desired_capacity',
+            'swap_instances',
+            'restore_max_size',
+        ]:
+            setattr(self.group, method, getattr(self.calls, method))
+
+    def test_waves_surge_up_to_max_surge_over_the_capacity(self):
+        self.group.apply_launch_configuration_rolling(batch_size=2, max_surge=1)
+
+        self.assertEqual(self.calls.mock_calls, [
+            call.terminate_instances(['i-1'], restore_max_size=False),
+            call.increase_desired_capacity(5),
+            call.swap_instances(['i-2'], expected_instances=2),
+            call.terminate_instances(['i-3'], restore_max_size=False),
+            call.increase_desired_capacity(5),
+            call.swap_instances(['i-4'], expected_instances=2),
+            call.restore_max_size(),
+        ])
+
+    def test_waves_without_surge_terminate_the_whole_wave_first(self):
+        self.group.apply_launch_configuration_rolling(batch_size=3, max_surge=0)
+
+        self.assertEqual(self.calls.mock_calls, [
+            call.terminate_instances(['i-1', 'i-2', 'i-3'], restore_max_size=False),
+            call.increase_desired_capacity(4),
+            call.swap_instances([], expected_instances=3),
+            call.terminate_instances(['i-4'], restore_max_size=False),
+            call.increase_desired_capacity(4),
+            call.swap_instances([], expected_instances=1),
+            call.restore_max_size(),
+        ])
+
+    def test_waves_within_max_surge_only_swap_instances(self):
+        self.group.apply_launch_configuration_rolling(batch_size=4, max_surge=4)
+
+        self.assertEqual(self.calls.mock_calls, [
+            call.increase_desired_capacity(8),
+            call.swap_instances(['i-1', 'i-2', 'i-3', 'i-4'], expected_instances=4),
+            call.restore_max_size(),
+        ])
+
+    def test_invalid_parameters(self):
+        for batch_size, max_surge in [(0, 1), (1, -1)]:
+            with self.assertRaises(EC2AutoScaleException):
+                self.group.apply_launch_configuration_rolling(batch_size, max_surge)
+        self.assertEqual(self.calls.mock_calls, [])
+
+
+class EC2AutoScaleGroupSwapTest(unittest.TestCase):
+    def setUp(self):
+        self.autoscale = Mock()
+        patcher = patch.object(
+            EC2AutoScaleGroup,
+            'autoscale',
+            new_callable=PropertyMock,
+            return_value=self.autoscale
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.group = EC2AutoScaleGroup('backend', 'app')
+
+    def ready_instances(self, *instance_ids):
+        def wait_for_new_instances_ready(expected_instances=None, on_instance_ready=None):
+            self.expected_instances = expected_instances
+            for instance_id in instance_ids:
+                on_instance_ready(instance_id)
+
+        self.group.wait_for_new_instances_ready = wait_for_new_instances_ready
+
+    def retired_instances(self):
+        for args, kwargs in self.autoscale.terminate_instance.call_args_list:
+            self.assertEqual(kwargs, {'decrement_capacity': True})
+        return sorted(args[0] for args, _ in self.autoscale.terminate_instance.call_args_list)
+
+    def test_an_old_instance_is_retired_per_ready_instance(self):
+        self.ready_instances('i-new-1', 'i-new-2')
+
+        self.group.swap_instances(['i-old-1', 'i-old-2'], expected_instances=2)
+
+        self.assertEqual(self.expected_instances, 2)
+        self.assertEqual(self.retired_instances(), ['i-old-1', 'i-old-2'])
+
+    def test_remaining_old_instances_are_retired_at_the_end(self):
+        self.ready_instances('i-new-1')
+
+        self.group.swap_instances(['i-old-1', 'i-old-2', 'i-old-3'])
+
+        self.assertEqual(self.retired_instances(), ['i-old-1', 'i-old-2', 'i-old-3'])
+
+    def test_old_instances_are_retired_only_once(self):
+        self.ready_instances('i-new-1', 'i-new-2', 'i-new-3')
+
+        self.group.swap_instances(['i-old-1'])
+
+        self.assertEqual(self.retired_instances(), ['i-old-1'])
+
+    def test_retirement_errors_are_raised(self):
+        self.ready_instances('i-new-1')
+        self.autoscale.terminate_instance.side_effect = BotoServerError(400, 'Bad Request')
+
+        with self.assertRaises(BotoServerError):
+            self.group.swap_instances(['i-old-1'])
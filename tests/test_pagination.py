@@ -0,0 +1,38 @@
+import unittest
+
+from mock import Mock
+
+from forseti.models.pagination import first, paginate
+
+
+class Page(list):
+    def __init__(self, items, next_token=None, next_marker=None):
+        super(Page, self).__init__(items)
+        self.next_token = next_token
+        self.next_marker = next_marker
+
+
+class PaginateTest(unittest.TestCase):
+    def test_all_the_pages_are_requested(self):
+        method = Mock(side_effect=[Page([1, 2], next_token='token'), Page([3])])
+
+        self.assertEqual(list(paginate(method, names=['backend'])), [1, 2, 3])
+        self.assertEqual(method.call_count, 2)
+        method.assert_called_with(names=['backend'], next_token='token')
+
+    def test_markers(self):
+        method = Mock(side_effect=[Page([1], next_marker='marker'), Page([2])])
+
+        items = paginate(method, token_argument='marker', token_attribute='next_marker')
+
+        self.assertEqual(list(items), [1, 2])
+        method.assert_called_with(marker='marker')
+
+    def test_pages_are_requested_when_needed(self):
+        method = Mock(side_effect=[Page([1], next_token='token'), Page([2])])
+
+        self.assertEqual(first(method), 1)
+        self.assertEqual(method.call_count, 1)
+
+    def test_first_without_items(self):
+        self.assertIsNone(first(Mock(return_value=Page([]))))
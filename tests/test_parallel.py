@@ -0,0 +1,61 @@
+import sys
+import unittest
+
+from mock import Mock, call, patch
+
+from forseti.deployers.parallel import ParallelDeployment
+
+
+def deployer(application, exception=None):
+    def deploy(ami_id):
+        sys.stdout.write('deploying %s\n' % ami_id)
+        if exception:
+            raise exception
+
+    return Mock(application=application, deploy=Mock(side_effect=deploy))
+
+
+class ParallelDeploymentTest(unittest.TestCase):
+    def setUp(self):
+        self.stdout = Mock()
+        patcher = patch('sys.stdout', self.stdout)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_all_the_applications_are_deployed_in_order(self):
+        deployers = [deployer('backend'), deployer('frontend')]
+
+        results = ParallelDeployment(deployers, max_workers=2).deploy('ami-1')
+
+        self.assertEqual([result.application for result in results], ['backend', 'frontend'])
+        self.assertTrue(all(result.succeeded for result in results))
+        for each in deployers:
+            each.deploy.assert_called_once_with('ami-1')
+
+    def test_the_output_is_prefixed_with_the_application(self):
+        ParallelDeployment([deployer('backend'), deployer('frontend')]).deploy('ami-1')
+
+        written = [args[0] for args, _ in self.stdout.write.call_args_list]
+        self.assertIn('[backend] deploying ami-1\n', written)
+        self.assertIn('[frontend] deploying ami-1\n', written)
+        self.assertIs(sys.stdout, self.stdout)
+
+    def test_a_failing_deployment_does_not_stop_the_rest(self):
+        error = ValueError('broken')
+        deployers = [deployer('backend', error), deployer('frontend')]
+
+        results = ParallelDeployment(deployers, max_workers=1).deploy()
+
+        self.assertFalse(results[0].succeeded)
+        self.assertIs(results[0].exception, error)
+        self.assertTrue(results[1].succeeded)
+        deployers[1].deploy.assert_called_once_with(None)
+
+    def test_summary(self):
+        deployment = ParallelDeployment([deployer('backend', ValueError('broken'))])
+        deployment.deploy()
+        self.stdout.reset_mock()
+
+        deployment.print_summary()
+
+        self.assertIn(call('backend: FAILED in 00:00 (broken)'), self.stdout.write.call_args_list)
@@ -0,0 +1,53 @@
+import unittest
+
+from mock import call, patch
+
+from forseti.deployers.sharding import ShardedCommand
+
+
+class ShardedCommandTest(unittest.TestCase):
+    def setUp(self):
+        self.exit_codes = {}
+        patcher = patch(
+            'forseti.deployers.sharding.run_command',
+            side_effect=lambda command, working_directory: self.exit_codes.get(command, [0]).pop(0)
+        )
+        self.run_command = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hosts_are_dealt_in_turns(self):
+        command = ShardedCommand('deploy', ['a', 'b', 'c', 'd', 'e'], shards=2)
+
+        self.assertEqual(command.split_hosts(), [['a', 'c', 'e'], ['b', 'd']])
+
+    def test_shards_are_limited_to_the_amount_of_hosts(self):
+        self.assertEqual(ShardedCommand('deploy', ['a', 'b'], shards=5).shards, 2)
+        self.assertEqual(ShardedCommand('deploy', [], shards=5).shards, 1)
+
+    def test_each_shard_runs_the_command_with_its_hosts(self):
+        command = ShardedCommand(
+            'deploy {dns_name}',
+            ['a', 'b', 'c'],
+            shards=2,
+            working_directory='/tmp',
+            command_args='--verbose'
+        )
+
+        results = command.run()
+
+        self.assertEqual([result.hosts for result in results], [['a', 'c'], ['b']])
+        self.assertTrue(all(result.succeeded for result in results))
+        self.assertEqual(
+            sorted(self.run_command.call_args_list),
+            [call('deploy a,c --verbose', '/tmp'), call('deploy b --verbose', '/tmp')]
+        )
+
+    def test_failing_shards_are_retried_without_affecting_the_rest(self):
+        self.exit_codes = {'deploy a': [1, 1, 0], 'deploy b': [2, 2, 2]}
+        command = ShardedCommand('deploy {dns_name}', ['a', 'b', 'c'], shards=3, retries=2)
+
+        results = command.run()
+
+        self.assertEqual([result.attempts for result in results], [3, 3, 1])
+        self.assertEqual([result.exit_code for result in results], [0, 2, 0])
+        self.assertEqual([result.shard for result in command.failed_results], [1])
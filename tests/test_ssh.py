@@ -0,0 +1,64 @@
+import unittest
+
+from mock import Mock, call
+
+from forseti.ssh import ParallelSSHExecutor
+
+
+class Output(list):
+    def __init__(self, lines, exit_code):
+        super(Output, self).__init__(lines)
+        self.channel = Mock(recv_exit_status=Mock(return_value=exit_code))
+
+
+def client(*exit_codes):
+    outputs = [(None, Output(['output\n'], exit_code), None) for exit_code in exit_codes]
+    return Mock(exec_command=Mock(side_effect=outputs))
+
+
+class ParallelSSHExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.clients = {}
+        self.pool = Mock(get=Mock(side_effect=lambda host: self.clients[host]))
+        self.executor = ParallelSSHExecutor(self.pool, max_workers=2)
+
+    def test_commands_run_in_order_in_all_the_hosts(self):
+        self.clients = {'a': client(0, 0), 'b': client(0, 0)}
+
+        results = self.executor.run(['a', 'b'], ['stop', 'start'])
+
+        self.assertEqual([result.host for result in results], ['a', 'b'])
+        self.assertTrue(all(result.succeeded for result in results))
+        for host_client in self.clients.values():
+            self.assertEqual(host_client.exec_command.call_args_list, [
+                call('stop', get_pty=True),
+                call('start', get_pty=True),
+            ])
+
+    def test_a_host_stops_at_the_first_failing_command(self):
+        self.clients = {'a': client(0, 3), 'b': client(0, 0, 0)}
+
+        results = self.executor.run(['a', 'b'], ['stop', 'migrate', 'start'])
+
+        self.assertEqual(results[0].exit_code, 3)
+        self.assertEqual(results[0].failed_command, 'migrate')
+        self.assertEqual(self.clients['a'].exec_command.call_count, 2)
+        self.assertTrue(results[1].succeeded)
+        self.assertEqual(self.executor.failed_results, [results[0]])
+
+    def test_connection_errors_are_recorded(self):
+        error = IOError('Connection refused')
+        self.clients = {'b': client(0)}
+
+        def get(host):
+            if host == 'a':
+                raise error
+            return self.clients[host]
+
+        self.pool.get.side_effect = get
+
+        results = self.executor.run(['a', 'b'], ['start'])
+
+        self.assertIs(results[0].exception, error)
+        self.assertFalse(results[0].succeeded)
+        self.assertTrue(results[1].succeeded)
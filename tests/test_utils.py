@@ -0,0 +1,214 @@
+import threading
+import unittest
+
+from mock import Mock, call, patch
+
+from forseti.exceptions import (
+    ForsetiCancelledException,
+    ForsetiException,
+    ForsetiTimeoutException,
+)
+from forseti.utils import (
+    StabilityDetector,
+    TaskGraph,
+    ThreadPrefixedStream,
+    VersionedNameAllocator,
+    Waiter,
+    run_concurrently,
+)
+
+
+class VersionedNameAllocatorTest(unittest.TestCase):
+    def test_next_name_follows_the_highest_version(self):
+        allocator = VersionedNameAllocator(
+            'backend-2015-05-01',
+            ['backend-2015-05-01-2', 'backend-2015-05-01-10', 'backend-2015-04-30-20', 'other']
+        )
+
+        self.assertEqual(allocator.next_name(), 'backend-2015-05-01-11')
+
+    def test_allocate_skips_taken_names(self):
+        taken = Exception('taken')
+        create = Mock(side_effect=[taken, 'resource'])
+        allocator = VersionedNameAllocator('backend-2015-05-01')
+
+        name, resource = allocator.allocate(create, lambda exception: exception is taken)
+
+        self.assertEqual((name, resource), ('backend-2015-05-01-2', 'resource'))
+
+    def test_allocate_raises_other_errors(self):
+        allocator = VersionedNameAllocator('backend-2015-05-01')
+
+        with self.assertRaises(ValueError):
+            allocator.allocate(Mock(side_effect=ValueError()), lambda exception: False)
+
+    def test_allocate_gives_up(self):
+        allocator = VersionedNameAllocator('backend-2015-05-01')
+
+        with self.assertRaises(ForsetiException):
+            allocator.allocate(Mock(side_effect=Exception()), lambda exception: True, attempts=3)
+
+
+class WaiterTest(unittest.TestCase):
+    def test_wait_returns_the_first_true_value(self):
+        predicate = Mock(side_effect=[None, False, 'done'])
+        sleep = Mock()
+        waiter = Waiter(interval=1, sleep=sleep)
+
+        self.assertEqual(waiter.wait(predicate, show_progress=False), 'done')
+        self.assertEqual(waiter.polls, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_interval_backs_off_up_to_max_interval(self):
+        sleep = Mock()
+        waiter = Waiter(interval=1, backoff=2, max_interval=3, sleep=sleep)
+
+        waiter.wait(Mock(side_effect=[False, False, False, True]), show_progress=False)
+
+        self.assertEqual(sleep.call_args_list, [call(1), call(2), call(3)])
+
+    def test_jitter_is_added_to_the_interval(self):
+        sleep = Mock()
+        waiter = Waiter(interval=2, jitter=0.5, sleep=sleep)
+
+        with patch('forseti.utils.random.uniform', return_value=0.5) as uniform:
+            waiter.wait(Mock(side_effect=[False, True]), show_progress=False)
+
+        uniform.assert_called_once_with(0, 1.0)
+        sleep.assert_called_once_with(2.5)
+
+    def test_timeout(self):
+        waiter = Waiter(interval=0.01, timeout=0.05)
+
+        with self.assertRaises(ForsetiTimeoutException):
+            waiter.wait(lambda: False, show_progress=False)
+
+    def test_cancel_event(self):
+        cancel_event = threading.Event()
+        cancel_event.set()
+        predicate = Mock()
+
+        with self.assertRaises(ForsetiCancelledException):
+            Waiter().wait(predicate, cancel_event=cancel_event, show_progress=False)
+        self.assertFalse(predicate.called)
+
+    def test_cancel_event_wakes_up_the_wait(self):
+        cancel_event = threading.Event()
+        threading.Timer(0.05, cancel_event.set).start()
+
+        with self.assertRaises(ForsetiCancelledException):
+            Waiter(interval=60, timeout=120).wait(
+                lambda: False,
+                cancel_event=cancel_event,
+                show_progress=False
+            )
+
+
+class RunConcurrentlyTest(unittest.TestCase):
+    def test_returns_the_results_in_order(self):
+        functions = [lambda cancel_event, i=i: i for i in range(5)]
+
+        self.assertEqual(run_concurrently(functions, 'Testing', max_workers=2), range(5))
+
+    def test_failure_cancels_the_rest(self):
+        def fail(cancel_event):
+            raise ValueError('boom')
+
+        def wait(cancel_event):
+            if not cancel_event.wait(5):
+                return 'not cancelled'
+            raise ForsetiCancelledException('cancelled')
+
+        with self.assertRaises(ValueError):
+            run_concurrently([wait, fail], 'Testing')
+
+
+class StabilityDetectorTest(unittest.TestCase):
+    def test_stable_after_observations_in_a_row(self):
+        detector = StabilityDetector(observations=3)
+
+        self.assertEqual(
+            [detector.observe(value) for value in [True, True, False, True, True, True]],
+            [False, False, False, False, False, True]
+        )
+        self.assertIsNotNone(detector.convergence_time)
+
+    def test_observations_must_fit_in_the_window(self):
+        detector = StabilityDetector(observations=2, window=10)
+
+        with patch('forseti.utils.time.time', side_effect=[0, 20, 25]):
+            self.assertFalse(detector.observe(True))
+            self.assertFalse(detector.observe(True))
+            self.assertTrue(detector.observe(True))
+        self.assertEqual(detector.convergence_time, 25)
+
+
+class ThreadPrefixedStreamTest(unittest.TestCase):
+    def test_lines_are_prefixed_by_the_writing_thread(self):
+        stream = Mock()
+        prefixed_stream = ThreadPrefixedStream(stream)
+        prefixed_stream.set_prefix('[main] ')
+
+        def write():
+            prefixed_stream.set_prefix('[worker] ')
+            prefixed_stream.write('from worker\n')
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+        prefixed_stream.write('from main\n')
+
+        self.assertEqual(
+            stream.write.call_args_list,
+            [call('[worker] from worker\n'), call('[main] from main\n')]
+        )
+
+    def test_only_whole_lines_and_their_last_version_are_written(self):
+        stream = Mock()
+        prefixed_stream = ThreadPrefixedStream(stream)
+
+        prefixed_stream.write('Waiting .')
+        prefixed_stream.write('\rWaiting o')
+        self.assertFalse(stream.write.called)
+
+        prefixed_stream.write('\rDone\n')
+        stream.write.assert_called_once_with('Done\n')
+
+
+class TaskGraphTest(unittest.TestCase):
+    def test_tasks_receive_the_results_of_their_dependencies(self):
+        graph = TaskGraph()
+        graph.add('group', lambda: 'group')
+        graph.add('policy', lambda group: '%s-policy' % group, depends_on=['group'])
+        graph.add('alarm', lambda policy, group: (policy, group), depends_on=['policy', 'group'])
+
+        results = graph.run()
+
+        self.assertEqual(results['alarm'], ('group-policy', 'group'))
+        self.assertEqual(set(graph.timings), set(['group', 'policy', 'alarm']))
+
+    def test_failed_task_stops_its_dependents(self):
+        graph = TaskGraph()
+        dependent = Mock()
+        graph.add('group', Mock(side_effect=ValueError('boom')))
+        graph.add('policy', dependent, depends_on=['group'])
+
+        with self.assertRaises(ValueError):
+            graph.run()
+        self.assertFalse(dependent.called)
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ForsetiException):
+            TaskGraph().add('policy', Mock(), depends_on=['group'])
+
+    def test_tasks_keep_the_prefix_of_the_caller(self):
+        stream = Mock()
+        prefixed_stream = ThreadPrefixedStream(stream)
+        prefixed_stream.set_prefix('[backend] ')
+
+        with patch('sys.stdout', prefixed_stream):
+            graph = TaskGraph()
+            graph.add('group', lambda: prefixed_stream.write('created\n'))
+            graph.run()
+
+        stream.write.assert_called_once_with('[backend] created\n')